@@ -0,0 +1,146 @@
+"""
+Versioned ML artifacts (model + vectorizer) shared by every worker.
+
+    MODEL_DIR/
+        CURRENT                          name of the live version
+        versions/<version>/model.joblib
+        versions/<version>/vectorizer.joblib
+
+Artifacts are loaded with `joblib.load(mmap_mode='r')`: numpy arrays in
+the (uncompressed) pickles are mapped read-only from the file instead of
+copied, so all workers on a host share one copy in the page cache.
+Publishing writes a complete version directory, then swaps CURRENT with
+os.replace; every worker sees the new version on its next check and
+loads both files of that version together. Without a CURRENT file the
+flat ML_MODEL_FILE / VECTORIZER_FILE pair is used, as before.
+
+    python -m app.artifacts publish MODEL VECTORIZER [--version V]
+    python -m app.artifacts status
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+from typing import Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR          = os.path.expanduser(os.getenv('MODEL_DIR', '~/Documents'))
+ML_MODEL_FILE      = os.getenv('ML_MODEL_FILE', os.path.join(MODEL_DIR, 'model.joblib'))
+VECTORIZER_FILE    = os.getenv('VECTORIZER_FILE', os.path.join(MODEL_DIR, 'vectorizer.joblib'))
+MODEL_POINTER_FILE = os.getenv('MODEL_POINTER_FILE', os.path.join(MODEL_DIR, 'CURRENT'))
+VERSIONS_DIR       = os.getenv('MODEL_VERSIONS_DIR', os.path.join(MODEL_DIR, 'versions'))
+
+# joblib mmap mode for loading ('' loads private copies)
+MODEL_MMAP_MODE = os.getenv('MODEL_MMAP_MODE', 'r') or None
+
+MODEL_NAME, VECTORIZER_NAME = 'model.joblib', 'vectorizer.joblib'
+
+def _stat_key(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    # os.replace gives the pointer a new inode even within one mtime tick
+    return st.st_mtime_ns, st.st_ino
+
+_pointer = (None, None)   # (stat key, version) of the last pointer read
+
+def current_version() -> Optional[str]:
+    """
+    Version named by the pointer file, or None when there is none.
+    """
+    global _pointer
+    key = _stat_key(MODEL_POINTER_FILE)
+    if key is None:
+        return None
+    if key != _pointer[0]:
+        with open(MODEL_POINTER_FILE) as f:
+            _pointer = (key, f.read().strip() or None)
+    return _pointer[1]
+
+def current_stamp() -> tuple:
+    """
+    Identifies the artifacts that should be live: the pointer's version,
+    or the flat files' stat keys. Cheap enough to check per call.
+    """
+    version = current_version()
+    if version is not None:
+        return ("version", version)
+    return ("files", _stat_key(ML_MODEL_FILE), _stat_key(VECTORIZER_FILE))
+
+def artifact_paths(stamp: tuple) -> tuple:
+    if stamp[0] == "version":
+        base = os.path.join(VERSIONS_DIR, stamp[1])
+        return os.path.join(base, MODEL_NAME), os.path.join(base, VECTORIZER_NAME)
+    return ML_MODEL_FILE, VECTORIZER_FILE
+
+def load(stamp: tuple) -> tuple:
+    """
+    (model, vectorizer) for `stamp`, memory-mapped; (None, None) when the
+    flat files don't exist. A version the pointer names but whose files
+    are missing raises FileNotFoundError.
+    """
+    model_path, vec_path = artifact_paths(stamp)
+    if not (os.path.exists(model_path) and os.path.exists(vec_path)):
+        if stamp[0] == "version":
+            raise FileNotFoundError(f"Model version {stamp[1]!r} is incomplete or missing")
+        return None, None
+    t0 = time.perf_counter()
+    model = joblib.load(model_path, mmap_mode=MODEL_MMAP_MODE)
+    vectorizer = joblib.load(vec_path, mmap_mode=MODEL_MMAP_MODE)
+    logger.info("loaded model %s in %.3fs", stamp, time.perf_counter() - t0)
+    return model, vectorizer
+
+def publish(model, vectorizer, version: str = None) -> str:
+    """
+    Write a new artifact version and make it live. Pickles are written
+    uncompressed so they can be memory-mapped.
+    """
+    version = version or time.strftime('%Y%m%d-%H%M%S')
+    final = os.path.join(VERSIONS_DIR, version)
+    if os.path.exists(final):
+        raise FileExistsError(f"Model version {version!r} already exists")
+    staging = os.path.join(VERSIONS_DIR, f".staging-{version}-{os.getpid()}")
+    os.makedirs(staging)
+    try:
+        joblib.dump(model, os.path.join(staging, MODEL_NAME))
+        joblib.dump(vectorizer, os.path.join(staging, VECTORIZER_NAME))
+        os.rename(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    tmp = f"{MODEL_POINTER_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, MODEL_POINTER_FILE)
+    return version
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.artifacts")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    pub = sub.add_parser("publish", help="install a model/vectorizer pair as the live version")
+    pub.add_argument("model")
+    pub.add_argument("vectorizer")
+    pub.add_argument("--version")
+    sub.add_parser("status", help="show the live version")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "publish":
+        version = publish(joblib.load(args.model), joblib.load(args.vectorizer), args.version)
+        print(f"published {version} (pointer {MODEL_POINTER_FILE})")
+    else:
+        stamp = current_stamp()
+        print(f"live: {stamp[1] if stamp[0] == 'version' else 'unversioned files'}; "
+              f"paths: {', '.join(artifact_paths(stamp))}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
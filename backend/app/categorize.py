@@ -1,35 +1,57 @@
 import os
-import json
+import csv
+import hashlib
+import logging
+import time
+import threading
+from collections import OrderedDict
+from typing import Iterator
 import pandas as pd
 import numpy as np
 from io import BytesIO
-from datetime import datetime
 from dateutil import parser as date_parser
 from rapidfuzz import fuzz, process
-import joblib
+
+from . import artifacts
+from .overrides import override_matcher
+
+logger = logging.getLogger(__name__)
 
 # ----------------------------
 # Configuration & Loading
 # ----------------------------
 
-BASE_PATH        = os.path.expanduser('~/Documents')
-OVERRIDES_FILE   = os.path.join(BASE_PATH, 'overrides.json')
-ML_MODEL_FILE    = os.path.join(BASE_PATH, 'model.joblib')
-VECTORIZER_FILE  = os.path.join(BASE_PATH, 'vectorizer.joblib')
-
-# Load overrides
-try:
-    with open(OVERRIDES_FILE) as f:
-        override_map = json.load(f)
-except:
-    override_map = {}
-
-# Load ML model & vectorizer if present
-if os.path.exists(ML_MODEL_FILE) and os.path.exists(VECTORIZER_FILE):
-    clf = joblib.load(ML_MODEL_FILE)
-    vec = joblib.load(VECTORIZER_FILE)
-else:
-    clf = vec = None
+# Model artifacts live in artifacts.py (MODEL_DIR, versions, pointer file);
+# the exact-match overrides file is read by overrides.py
+
+# ML model & vectorizer (memory-mapped), loaded on first use and swapped
+# when the published version changes. Kept as one (clf, vec) pair so a
+# reader never combines a model with another version's vectorizer.
+_model = (None, None)
+_model_stamp = None
+_failed_stamp = None
+_model_lock = threading.Lock()
+
+def refresh_model() -> tuple:
+    """
+    (Re)load the model & vectorizer if the live artifacts changed since
+    the last load. Returns the stamp of the artifacts in use; a version
+    that fails to load is skipped and the previous one kept.
+    """
+    global _model, _model_stamp, _failed_stamp
+    stamp = artifacts.current_stamp()
+    if stamp == _model_stamp or stamp == _failed_stamp:
+        return _model_stamp
+    with _model_lock:
+        # another thread may have loaded (or given up on) it meanwhile
+        if stamp != _model_stamp and stamp != _failed_stamp:
+            try:
+                _model = artifacts.load(stamp)
+                _model_stamp = stamp
+            except Exception:
+                logger.exception("could not load model %s; keeping %s", stamp, _model_stamp)
+                _failed_stamp = stamp
+        return _model_stamp
 
 # Keyword and MCC maps
 CATEGORY_KEYWORDS = {
@@ -53,6 +75,34 @@ MCC_MAP = {
 }
 FUZZY_THRESHOLD = 60
 
+# Batch scoring: unique descriptions per cdist call (bounds the score
+# matrix) and rapidfuzz worker threads (-1 = all cores)
+CDIST_BLOCK_SIZE = 5000
+CDIST_WORKERS    = 1
+
+# ML fallback: rows per vectorizer/predict call, and the minimum
+# predict_proba confidence to accept a prediction (0 = plain predict)
+ML_BATCH_SIZE     = int(os.getenv('ML_BATCH_SIZE', 2048))
+ML_MIN_CONFIDENCE = float(os.getenv('ML_MIN_CONFIDENCE', 0.0))
+
+# Date formats tried (in order) when inferring a file's date column;
+# cells none of them fit fall back to dateutil
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y/%m/%d',
+    '%d/%m/%Y', '%m/%d/%Y', '%d/%m/%y', '%m/%d/%y',
+    '%d-%m-%Y', '%m-%d-%Y', '%d-%m-%y', '%m-%d-%y',
+    '%d.%m.%Y', '%d.%m.%y',
+    '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S',
+    '%d %b %Y', '%d-%b-%Y', '%d-%b-%y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y', '%d %b %y',
+]
+DATE_SAMPLE_SIZE = 200
+
+# Streaming import: rows parsed, categorized and persisted per chunk
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 10000))
+
+# Memoized categorization results
+CATEGORY_CACHE_SIZE = 50000
+
 # Field synonyms
 FIELD_SYNONYMS = {
     'date':        ['date', 'transaction date', 'post date', 'value date', 'date posted'],
@@ -68,10 +118,90 @@ FIELD_SYNONYMS = {
 # Helpers
 # ----------------------------
 
+class CategoryCache:
+    """
+    Bounded LRU map of (normalized description, MCC) -> category.
+    Entries are dropped wholesale whenever the rules version changes.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize   = maxsize
+        self.version   = None
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        # Uploads categorize on threadpool threads concurrently
+        self._lock = threading.Lock()
+
+    def validate(self, version) -> None:
+        with self._lock:
+            if version != self.version:
+                self._data.clear()
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size":      len(self._data),
+                "maxsize":   self.maxsize,
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "evictions": self.evictions,
+                "hit_rate":  self.hits / lookups if lookups else 0.0,
+            }
+
+category_cache = CategoryCache(CATEGORY_CACHE_SIZE)
+
+def rules_version() -> tuple:
+    """
+    Fingerprint of everything a cached category depends on: the overrides
+    (JSON map and table), the keyword map and the ML model files.
+    """
+    return (
+        override_matcher().version,
+        hash(tuple((cat, tuple(kws)) for cat, kws in CATEGORY_KEYWORDS.items())),
+        FUZZY_THRESHOLD,
+        refresh_model(),
+    )
+
 def choose_category(desc: str, mcc: str = None) -> str:
     d = str(desc).lower().strip()
-    if d in override_map:
-        return override_map[d]
+    category_cache.validate(rules_version())
+    key = (d, mcc if mcc in MCC_MAP else None)
+    if (cached := category_cache.get(key)) is not None:
+        return cached
+    cat = _choose_category(d, mcc)
+    category_cache.put(key, cat)
+    return cat
+
+def _choose_category(d: str, mcc: str = None) -> str:
+    if (cat := override_matcher().match(d)) is not None:
+        return cat
     if mcc in MCC_MAP:
         return MCC_MAP[mcc]
     # keyword-based fuzzy match
@@ -83,100 +213,478 @@ def choose_category(desc: str, mcc: str = None) -> str:
                 best_cat, best_score = cat, score
     if best_score >= FUZZY_THRESHOLD:
         return best_cat
-    # ML fallback
-    if clf and vec:
-        pred = clf.predict(vec.transform([d]))[0]
-        if pred in CATEGORY_KEYWORDS or pred == 'Other':
-            return pred
-    return 'Other'
+    return predict_category(d)
+
+def predict_category(d: str) -> str:
+    """
+    ML fallback for a normalized description that no rule matched.
+    """
+    return predict_categories([d])[0]
+
+def predict_categories(descs: list, batch_size: int = None,
+                       min_confidence: float = None, timings: list = None) -> list:
+    """
+    Batched ML fallback: one vectorizer transform and one predict per
+    `batch_size` descriptions. With `min_confidence`, predictions whose
+    predict_proba falls below it become 'Other'. Per-batch timings are
+    appended to `timings` when given.
+    """
+    batch_size = batch_size or ML_BATCH_SIZE
+    min_confidence = ML_MIN_CONFIDENCE if min_confidence is None else min_confidence
+    clf, vec = _model
+    if not (clf and vec) or not descs:
+        return ['Other'] * len(descs)
+
+    use_proba = min_confidence > 0 and hasattr(clf, 'predict_proba')
+    valid = set(CATEGORY_KEYWORDS) | {'Other'}
+    out = []
+    for start in range(0, len(descs), batch_size):
+        batch = descs[start:start + batch_size]
+        t0 = time.perf_counter()
+        X = vec.transform(batch)
+        if use_proba:
+            proba = clf.predict_proba(X)
+            preds = clf.classes_[proba.argmax(axis=1)]
+            preds = np.where(proba.max(axis=1) >= min_confidence, preds, 'Other')
+        else:
+            preds = clf.predict(X)
+        out.extend(str(p) if p in valid else 'Other' for p in preds)
+        elapsed = time.perf_counter() - t0
+        if timings is not None:
+            timings.append({"rows": len(batch), "seconds": elapsed})
+        logger.debug("ML fallback batch of %d rows took %.3fs", len(batch), elapsed)
+    return out
+
+def keyword_categories(descs) -> np.ndarray:
+    """
+    Score normalized descriptions against every keyword at once and
+    return the best category per description, or None below threshold.
+    Ties resolve to the first keyword in CATEGORY_KEYWORDS order, as in
+    `choose_category`.
+    """
+    cats = [cat for cat, kws in CATEGORY_KEYWORDS.items() for _ in kws]
+    kws  = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    out  = np.full(len(descs), None, dtype=object)
+    if not kws:
+        return out
+    cats = np.array(cats, dtype=object)
+    for start in range(0, len(descs), CDIST_BLOCK_SIZE):
+        block  = descs[start:start + CDIST_BLOCK_SIZE]
+        scores = process.cdist(block, kws, scorer=fuzz.partial_ratio,
+                               dtype=np.float64, workers=CDIST_WORKERS)
+        best   = scores.argmax(axis=1)
+        hit    = scores[np.arange(len(block)), best] >= FUZZY_THRESHOLD
+        out[start:start + len(block)] = np.where(hit, cats[best], None)
+    return out
+
+def rule_categories(descs: list) -> list:
+    """
+    Categories for normalized descriptions from the keyword map and the ML
+    fallback alone, i.e. what `choose_category` gives without overrides or
+    an MCC.
+    """
+    refresh_model()
+    cats = keyword_categories(descs)
+    misses = [d for d, cat in zip(descs, cats) if cat is None]
+    predicted = iter(predict_categories(misses))
+    return [cat if cat is not None else next(predicted) for cat in cats]
+
+def categorize_batch(descriptions, mccs=None, ml_batch_size: int = None,
+                     ml_min_confidence: float = None) -> pd.Series:
+    """
+    Vectorized `choose_category` over whole Description/MCC columns.
+    Precedence is unchanged: override (exact, then keyword containment),
+    MCC, keyword, ML, 'Other'.
+    Fuzzy scoring runs once per unique description, and every keyword
+    miss goes through a single batched ML fallback (timings are left in
+    the result's `attrs['ml_batches']`).
+    """
+    desc = pd.Series(descriptions).astype(str).str.lower().str.strip()
+    uniq = desc.unique()
+    cats = desc.map(dict(zip(uniq, override_matcher().match_many(uniq))))
+    if mccs is not None:
+        mcc  = pd.Series(mccs, index=desc.index)
+        cats = cats.where(cats.notna(), mcc.map(MCC_MAP))
+    cats = cats.astype(object)
+
+    pending = cats.isna()
+    if pending.any():
+        category_cache.validate(rules_version())
+        resolved, misses = {}, []
+        for d in desc[pending].unique():
+            if (cached := category_cache.get((d, None))) is not None:
+                resolved[d] = cached
+            else:
+                misses.append(d)
+        kw_cats = keyword_categories(misses)
+        for d, cat in zip(misses, kw_cats):
+            if cat is not None:
+                resolved[d] = cat
+        fallback = [d for d, cat in zip(misses, kw_cats) if cat is None]
+        timings = []
+        resolved.update(zip(fallback, predict_categories(
+            fallback, ml_batch_size, ml_min_confidence, timings)))
+        for d in misses:
+            category_cache.put((d, None), resolved[d])
+        cats[pending] = desc[pending].map(resolved)
+        cats.attrs['ml_batches'] = timings
+    return cats
 
 def fuzzy_find_header(headers: list[str], synonyms: list[str]) -> str | None:
     """
     Given a list of column headers and a list of synonyms,
     return the best matching header above threshold, or None.
     """
-    match, score, _ = process.extractOne(
-        query=synonyms,
-        choices=headers,
-        scorer=fuzz.token_sort_ratio
-    )
-    return match if score >= FUZZY_THRESHOLD else None
+    if not headers:
+        return None
+    scores = process.cdist(synonyms, [h.lower() for h in headers],
+                           scorer=fuzz.token_sort_ratio).max(axis=0)
+    best = int(scores.argmax())
+    return headers[best] if scores[best] >= FUZZY_THRESHOLD else None
+
+def read_head(buf, max_rows: int = 10) -> list[list[str]]:
+    """
+    Read the first `max_rows` lines of a CSV once and split them into
+    stripped cells. The buffer is rewound afterwards.
+    """
+    buf.seek(0)
+    lines = []
+    for _ in range(max_rows):
+        line = buf.readline()
+        if not line:
+            break
+        lines.append(line.decode('utf-8-sig', errors='replace') if isinstance(line, bytes) else line)
+    buf.seek(0)
+    return [[c.strip() for c in row] for row in csv.reader(lines)]
+
+def _looks_like_header(cells: list[str]) -> bool:
+    low = {c.lower() for c in cells}
+    has_amount = (low & set(FIELD_SYNONYMS['amount'])
+                  or (any('debit' in c for c in low) and any('credit' in c for c in low)))
+    return bool(low & set(FIELD_SYNONYMS['date']) and has_amount
+                and low & set(FIELD_SYNONYMS['description']))
 
 def detect_header_row(buf: BytesIO, ext: str, max_rows: int = 10) -> int:
     """
-    Scan the first `max_rows` lines to find the row index
+    Scan the first `max_rows` lines (read once) to find the row index
     where date, amount, and description headers co-occur.
     Returns the number of rows to skip.
     """
-    for skip in range(max_rows):
-        try:
-            df = pd.read_csv(buf, dtype=str, skiprows=skip, nrows=0)
-            cols = [c.strip() for c in df.columns]
-            low = {c.lower() for c in cols}
-            if {'date','amount'}.issubset(low) and {'description','details'}.intersection(low):
-                return skip
-        except:
-            pass
-        buf.seek(0)
-    return 0
+    return _header_index(read_head(buf, max_rows))
 
-# ----------------------------
-# Main Import Function
-# ----------------------------
+def _header_index(head: list[list[str]]) -> int:
+    return next((i for i, cells in enumerate(head) if _looks_like_header(cells)), 0)
 
-def import_transactions(source, filename: str) -> pd.DataFrame:
+def header_fingerprint(headers: list[str]) -> str:
     """
-    Load a file (bytes or file path) into a DataFrame, normalize columns,
-    parse dates & amounts, and categorize transactions.
+    Stable signature of a header row, used to recognise a bank layout.
     """
-    ext = os.path.splitext(filename)[1].lower()
-    buf = BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, 'rb')
+    normalized = '\x1f'.join(h.strip().lower() for h in headers)
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
 
-    # 1) Read raw DataFrame
+class AmbiguousDateFormat(ValueError):
+    """
+    Raised when a file's dates fit both day-first and month-first formats
+    and no `dayfirst` hint was given.
+    """
+
+def _is_dayfirst(fmt: str) -> bool:
+    return '%m' not in fmt or fmt.index('%d') < fmt.index('%m')
+
+def _date_sample(values: pd.Series) -> tuple:
+    """
+    (sample, parsed_by, parseable) for a date column: up to
+    DATE_SAMPLE_SIZE distinct stripped values, each DATE_FORMATS entry's
+    parse of them, and which values at least one format understands.
+    """
+    sample = pd.Series(values.dropna().astype(str).str.strip().unique()[:DATE_SAMPLE_SIZE])
+    parsed_by = {fmt: pd.to_datetime(sample, format=fmt, errors='coerce') for fmt in DATE_FORMATS}
+    # cells no format understands (junk rows) are left to the residual pass
+    parseable = np.logical_or.reduce([p.notna().to_numpy() for p in parsed_by.values()])
+    return sample, parsed_by, parseable
+
+def infer_date_format(values: pd.Series, dayfirst: bool = None) -> str | None:
+    """
+    Pick the DATE_FORMATS entry that parses every parseable value in a
+    sample of the column, or None if none does. When formats disagree on the order of day
+    and month, `dayfirst` decides; without it AmbiguousDateFormat is raised.
+    """
+    sample, parsed_by, parseable = _date_sample(values)
+    if sample.empty or not parseable.any():
+        return None
+    fits = {fmt: p[parseable] for fmt, p in parsed_by.items() if p[parseable].notna().all()}
+    if not fits:
+        return None
+    first = next(iter(fits))
+    if all(parsed.equals(fits[first]) for parsed in fits.values()):
+        return first
+    if dayfirst is not None:
+        preferred = [fmt for fmt in fits if _is_dayfirst(fmt) == dayfirst]
+        if preferred:
+            return preferred[0]
+    raise AmbiguousDateFormat(
+        f"Dates such as '{sample.iloc[0]}' fit both {', '.join(fits)}; "
+        "specify whether the file is day-first"
+    )
+
+def date_format_fits(values: pd.Series, date_format: str) -> bool:
+    """
+    Whether `date_format` parses every value in a sample of the column
+    that some DATE_FORMATS entry parses, i.e. whether a format remembered
+    for this layout still holds for this file.
+    """
+    sample, _, parseable = _date_sample(values)
+    if sample.empty or not parseable.any():
+        return True
+    return bool(pd.to_datetime(sample[parseable], format=date_format, errors='coerce').notna().all())
+
+def _parse_date(value: str, dayfirst: bool = False):
+    try:
+        return date_parser.parse(value, dayfirst=dayfirst)
+    except (ValueError, OverflowError):
+        return pd.NaT
+
+def parse_dates(values: pd.Series, date_format: str = None, dayfirst: bool = None) -> pd.Series:
+    """
+    Vectorized date parsing with a known (or inferred) format; only cells
+    the format rejects are handed to dateutil, reading day and month in
+    the format's order.
+    """
+    values = values.where(values.isna(), values.astype(str).str.strip())
+    if date_format is None:
+        date_format = infer_date_format(values, dayfirst)
+    if date_format:
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        dayfirst = _is_dayfirst(date_format)
+    else:
+        parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    residual = parsed.isna() & values.notna()
+    if residual.any():
+        parsed = parsed.astype(object)
+        parsed[residual] = values[residual].apply(_parse_date, dayfirst=bool(dayfirst))
+        parsed = pd.to_datetime(parsed)
+    parsed.attrs['date_format'] = date_format
+    return parsed
+
+def resolve_profile(headers: list[str], filename: str) -> dict:
+    """
+    Work out a format profile for a header row: how to rename raw headers
+    to Date/Amount/Description(/Mcc), and whether amounts come signed in
+    one column or split into debit/credit columns. Raises KeyError when a
+    required column cannot be found.
+    """
+    low = [h.lower() for h in headers]
+    renamed = {h: h for h in headers}
+    claimed = set()
+    convention = 'signed'
+
+    # Separate debit/credit columns when there is no single amount column
+    debit  = next((h for h, l in zip(headers, low) if 'debit' in l), None)
+    credit = next((h for h, l in zip(headers, low) if 'credit' in l), None)
+    if debit and credit and not {'amount', 'transaction amount'} & set(low):
+        convention = 'debit_credit'
+        renamed[debit], renamed[credit] = 'Debit', 'Credit'
+        claimed |= {debit, credit}
+
+    # Rename via fuzzy + synonyms
+    for field, syns in FIELD_SYNONYMS.items():
+        if field == 'amount' and convention == 'debit_credit':
+            continue
+        candidates = [h for h in headers if h not in claimed]
+        if match := fuzzy_find_header(candidates, syns):
+            renamed[match] = field.capitalize()
+            claimed.add(match)
+    columns = list(renamed.values())
+
+    # Ensure required columns
+    needed = ['Date', 'Description'] + (['Debit', 'Credit'] if convention == 'debit_credit' else ['Amount'])
+    if 'Description' not in columns and (others := [c for c in columns if c not in needed + ['Mcc']]):
+        renamed = {h: 'Description' if c == others[0] else c for h, c in renamed.items()}
+        columns = list(renamed.values())
+    missing = [f for f in needed if f not in columns]
+    if missing:
+        raise KeyError(f"Missing required columns: {missing} in '{filename}'")
+    return {
+        "fingerprint":       header_fingerprint(headers),
+        "skip_rows":         0,
+        "columns":           {h: c for h, c in renamed.items() if h != c},
+        "date_format":       None,
+        "amount_convention": convention,
+    }
+
+def _parse_amounts(values: pd.Series) -> pd.Series:
+    # unparseable cells become NaN rather than failing the whole file
+    return pd.to_numeric(values
+                         .str.replace(',', '')
+                         .str.replace(r'[\(\)]', '', regex=True),
+                         errors='coerce')
+
+def prepare_transactions(df: pd.DataFrame, profile: dict, filename: str,
+                         dayfirst: bool = None) -> pd.DataFrame:
+    """
+    Rename raw columns, parse dates & amounts, and categorize one frame
+    (a whole file or a single chunk of it) according to `profile`. The
+    date format is inferred when the profile has none and left in
+    `attrs['date_format']`.
+    """
+    df = df.rename(columns=profile["columns"])
+
+    # Parse & clean
+    dates = parse_dates(df['Date'], profile.get("date_format"), dayfirst)
+    df['Date']   = dates
+    if profile.get("amount_convention") == 'debit_credit':
+        df['Amount'] = (_parse_amounts(df['Credit'].fillna('0'))
+                        - _parse_amounts(df['Debit'].fillna('0')))
+    else:
+        df['Amount'] = _parse_amounts(df['Amount'])
+
+    # Categorize
+    mcc = df['Mcc'] if 'Mcc' in df.columns else df.get('MCC')
+    hits, misses = category_cache.hits, category_cache.misses
+    cats = categorize_batch(df['Description'], mcc)
+    df['Category']     = cats
+    ml_batches = cats.attrs.get('ml_batches', [])
+    df.attrs['ml_batches'] = ml_batches
+    logger.info("categorized %d rows from '%s': cache hits=%d misses=%d, "
+                "ML fallback %d rows in %d batches (%.3fs)",
+                len(df), filename, category_cache.hits - hits,
+                category_cache.misses - misses,
+                sum(b["rows"] for b in ml_batches), len(ml_batches),
+                sum(b["seconds"] for b in ml_batches))
+    df['OrigCategory'] = df['Category']
+    df.attrs['date_format'] = dates.attrs['date_format']
+
+    return df
+
+def _open_source(source):
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'rb')
+
+def _read_frames(buf, ext: str, profiles=None, chunksize: int = None):
+    """
+    Open the raw data and, for CSV, settle where the header is. The first
+    lines are read once and matched against known header fingerprints, so
+    a known layout skips header and column detection entirely.
+    Returns (frames, header, skip, profile): `frames` is one DataFrame, or
+    an iterator of them when `chunksize` is given; `header` is the raw CSV
+    header row (None for other formats) found `skip` lines in; `profile`
+    is the cached profile that matched, if any.
+    """
+    header = profile = None
+    skip = 0
+    buf.seek(0)
     if ext == '.csv':
-        buf.seek(0)
-        skip = detect_header_row(buf, ext)
-        buf.seek(0)
-        df = pd.read_csv(buf, dtype=str, skiprows=skip)
+        head = read_head(buf)
+        if profiles is not None:
+            fingerprints = [header_fingerprint(cells) if cells else None for cells in head]
+            known = profiles.find([fp for fp in fingerprints if fp])
+            for i, fp in enumerate(fingerprints):
+                if fp in known:
+                    profile = dict(known[fp], skip_rows=i)
+                    break
+        skip = profile["skip_rows"] if profile else _header_index(head)
+        header = head[skip] if skip < len(head) else None
+        frames = pd.read_csv(buf, dtype=str, skiprows=skip, chunksize=chunksize)
     elif ext in ('.xls', '.xlsx'):
-        buf.seek(0)
-        df = pd.read_excel(buf, engine='openpyxl', dtype=str)
+        frames = pd.read_excel(buf, engine='openpyxl', dtype=str)
     elif ext == '.json':
-        buf.seek(0)
-        df = pd.read_json(buf, dtype=str)
+        frames = pd.read_json(buf, dtype=str)
     else:
         raise ValueError(f"Unsupported extension '{ext}'")
 
-    # Trim column whitespace and capture headers
+    if chunksize and isinstance(frames, pd.DataFrame):
+        # Excel and JSON cannot be read incrementally: load once and slice
+        whole = frames
+        frames = (whole.iloc[i:i + chunksize] for i in range(0, len(whole), chunksize))
+    return frames, header, skip, profile
+
+def _settle_profile(df: pd.DataFrame, header, skip: int, profile, filename: str, profiles,
+                    dayfirst: bool = None) -> dict:
+    """
+    Trim headers and resolve (or reuse) the format profile for them.
+    """
     df.columns = [c.strip() for c in df.columns]
-    headers = list(df.columns)
+    if profile is None:
+        fingerprint = header_fingerprint(header or list(df.columns))
+        if header is None and profiles is not None:
+            # Excel/JSON: the header is only known once the data is read
+            profile = profiles.find([fingerprint]).get(fingerprint)
+        if profile is None:
+            profile = resolve_profile(list(df.columns), filename)
+            return dict(profile, fingerprint=fingerprint, skip_rows=skip, new=True)
+    return _check_date_format(df, profile, dayfirst)
 
-    # 2) Rename via fuzzy + synonyms
-    mapping = {}
-    for field, syns in FIELD_SYNONYMS.items():
-        if match := fuzzy_find_header(headers, syns):
-            mapping[field.capitalize()] = match
-    df = df.rename(columns=mapping)
-
-    # 3) Ensure required columns
-    needed = ['Date', 'Amount', 'Description']
-    missing = [f for f in needed if f not in df.columns]
-    if 'Description' not in df.columns and (others := [c for c in df.columns if c not in ('Date','Amount')]):
-        df = df.rename(columns={others[0]: 'Description'})
-        missing = [f for f in needed if f not in df.columns]
-    if missing:
-        raise KeyError(f"Missing required columns: {missing} in '{filename}'")
+def _check_date_format(df: pd.DataFrame, profile: dict, dayfirst: bool = None) -> dict:
+    """
+    A cached profile with its date format dropped when this file's dates
+    don't fit it, or when it contradicts the `dayfirst` hint, so the
+    format is inferred (and the ambiguity check run) again.
+    """
+    date_format = profile.get("date_format")
+    if not date_format:
+        return profile
+    column = next((h for h, c in profile["columns"].items() if c == 'Date'), 'Date')
+    if column not in df.columns:
+        return profile
+    contradicts = (dayfirst is not None and not date_format.startswith('%Y')
+                   and _is_dayfirst(date_format) != dayfirst)
+    if not contradicts and date_format_fits(df[column], date_format):
+        return profile
+    return dict(profile, date_format=None)
 
-    # 4) Parse & clean
-    df['Date']   = df['Date'].apply(date_parser.parse)
-    df['Amount'] = (df['Amount']
-                    .str.replace(',', '')
-                    .str.replace(r'[\(\)]', '', regex=True)
-                    .astype(float))
+def _remember_profile(profiles, profile: dict, df: pd.DataFrame) -> None:
+    date_format = df.attrs.get('date_format')
+    if profiles is None or not (profile.get('new') or date_format != profile.get('date_format')):
+        return
+    profile.pop('new', None)
+    profile['date_format'] = date_format
+    profiles.save(profile)
 
-    # 5) Categorize
-    df['Category']     = df.apply(lambda r: choose_category(
-                              r['Description'], r.get('Mcc') or r.get('MCC')), axis=1)
-    df['OrigCategory'] = df['Category']
+# ----------------------------
+# Main Import Function
+# ----------------------------
+
+def import_transactions(source, filename: str, dayfirst: bool = None, profiles=None) -> pd.DataFrame:
+    """
+    Load a file (bytes, file path or binary file object) into a DataFrame,
+    normalize columns, parse dates & amounts, and categorize transactions.
+    `profiles` (a ProfileStore) caches the detected format per layout.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    buf = _open_source(source)
+
+    df, header, skip, profile = _read_frames(buf, ext, profiles)
+    profile = _settle_profile(df, header, skip, profile, filename, profiles, dayfirst)
+    df = prepare_transactions(df, profile, filename, dayfirst)
+    _remember_profile(profiles, profile, df)
+    return df
+
+def iter_import_transactions(source, filename: str, chunksize: int = None,
+                             dayfirst: bool = None, profiles=None) -> Iterator[pd.DataFrame]:
+    """
+    Streaming variant of `import_transactions`: yields prepared frames of
+    at most `chunksize` rows so that neither the file nor the full
+    DataFrame is held in memory. The profile (and with it the date
+    format) is settled once, from the first chunk.
+    """
+    chunksize = chunksize or IMPORT_CHUNK_SIZE
+    ext = os.path.splitext(filename)[1].lower()
+    buf = _open_source(source)
 
-    return df
\ No newline at end of file
+    chunks, header, skip, profile = _read_frames(buf, ext, profiles, chunksize)
+    settled = False
+    for chunk in chunks:
+        if not settled:
+            profile = _settle_profile(chunk, header, skip, profile, filename, profiles, dayfirst)
+        else:
+            chunk.columns = [c.strip() for c in chunk.columns]
+        chunk = prepare_transactions(chunk, profile, filename, dayfirst)
+        if not settled:
+            _remember_profile(profiles, profile, chunk)
+            # the format inferred from the first chunk holds for the whole file
+            profile = dict(profile, date_format=chunk.attrs['date_format'])
+            settled = True
+        yield chunk
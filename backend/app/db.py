@@ -1,21 +1,106 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fin.db"
+# Database URLs; reads can point at a replica, by default they share the file
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fin.db")
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("DATABASE_READ_URL", SQLALCHEMY_DATABASE_URL)
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# SQLite storage profile. WAL lets readers carry on while an import commits;
+# synchronous=NORMAL is durable across app crashes under WAL (only an OS
+# crash can lose the last commits).
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", 10))
+
+def _async_url(url: str) -> str:
+    u = make_url(url)
+    if u.get_backend_name() != "sqlite" or u.get_driver_name() == "aiosqlite":
+        return url
+    return u.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+
+# Async driver URL for the read pool (aiosqlite unless given explicitly)
+ASYNC_READ_DATABASE_URL = os.getenv("ASYNC_DATABASE_READ_URL", _async_url(SQLALCHEMY_READ_DATABASE_URL))
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _is_memory(url: str) -> bool:
+    # Any sqlite driver: no file (sqlite://, :memory:) or a memory URI
+    return _is_sqlite(url) and (make_url(url).database in (None, "", ":memory:") or "mode=memory" in url)
+
+def _sqlite_pragmas(read_only: bool):
+    def on_connect(dbapi_conn, connection_record):
+        cur = dbapi_conn.cursor()
+        if not read_only:
+            # Persistent in the file; only the writer needs to set it
+            cur.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cur.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cur.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cur.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cur.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+        cur.close()
+    return on_connect
+
+def _make_engine(url: str, read_only: bool = False, is_async: bool = False, **kwargs):
+    if _is_sqlite(url):
+        kwargs.setdefault("connect_args", {"check_same_thread": False})
+    if _is_memory(url):
+        # One connection for every thread, or each would get its own database
+        kwargs.pop("pool_size", None)
+        kwargs.pop("max_overflow", None)
+        kwargs["poolclass"] = StaticPool
+    eng = (create_async_engine if is_async else create_engine)(url, **kwargs)
+    if _is_sqlite(url):
+        event.listen(eng.sync_engine if is_async else eng, "connect", _sqlite_pragmas(read_only))
+    return eng
+
+# Create SQLAlchemy engines: one for writes, a separate pool for reads
+engine = _make_engine(SQLALCHEMY_DATABASE_URL)
 
-# Session factory for dependency injection
+if SQLALCHEMY_READ_DATABASE_URL == SQLALCHEMY_DATABASE_URL and _is_memory(SQLALCHEMY_DATABASE_URL):
+    # A second pool would see a different in-memory database
+    read_engine = engine
+else:
+    read_engine = _make_engine(SQLALCHEMY_READ_DATABASE_URL, read_only=True,
+                               pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+
+# Async engine on the same read-only profile, for async endpoints. An
+# in-memory database can't be shared with a second driver, so there it is
+# left unset and async endpoints read through `read_engine` instead.
+if _is_memory(SQLALCHEMY_READ_DATABASE_URL) or _is_memory(ASYNC_READ_DATABASE_URL):
+    async_read_engine = None
+else:
+    async_read_engine = _make_engine(ASYNC_READ_DATABASE_URL, read_only=True, is_async=True,
+                                     pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+
+# Session factories for dependency injection
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
     bind=engine
 )
 
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=read_engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for ORM models
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
@@ -1,13 +1,19 @@
 # backend/app/dependencies.py
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .db import SessionLocal
+from .db import SessionLocal, ReadSessionLocal, AsyncReadSessionLocal, async_read_engine
 from .models import User
 from .security import verify_token
+from .user_cache import CurrentUser, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login", auto_error=False)
 
 def get_db():
     db = SessionLocal()
@@ -16,7 +22,53 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def get_read_db():
+    """
+    Session on the read-only pool, for endpoints that never write; these
+    don't queue behind imports for a connection.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+class _SyncReadSession:
+    """
+    Awaitable `execute` over a sync read session, standing in for the
+    AsyncSession when the database is in memory and only the sync engine
+    can see it.
+    """
+    def __init__(self, db):
+        self._db = db
+
+    async def execute(self, statement, *args, **kwargs):
+        return self._db.execute(statement, *args, **kwargs)
+
+async def get_async_db():
+    """
+    AsyncSession on the read-only pool, for `async def` read endpoints.
+    """
+    if async_read_engine is None:
+        with ReadSessionLocal() as db:
+            yield _SyncReadSession(db)
+        return
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+async def get_current_user(token: str = Depends(oauth2_scheme),
+                           db: AsyncSession = Depends(get_async_db)) -> CurrentUser:
+    """
+    The caller for a bearer token. A cached token costs nothing; on a
+    miss the token is verified and its `uid` loaded on the request's async
+    read session (shared with async endpoints, and only connected when
+    used), so a user deleted or changed since the token was issued is
+    caught once their cache entry is dropped.
+    """
+    user = user_cache.get(token)
+    if user is not None:
+        return user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -25,12 +77,27 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     try:
         payload = verify_token(token)
         email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
+        uid = payload.get("uid")
     except Exception:
         raise credentials_exception
+    # Tokens without "uid" predate it and are past ACCESS_TOKEN_EXPIRE_MINUTES
+    if email is None or not isinstance(uid, int):
+        raise credentials_exception
 
-    user = db.query(User).filter(User.email == email).first()
-    if user is None:
+    row = (await db.execute(select(User.id, User.email, User.name).where(User.id == uid))).first()
+    if row is None or row.email != email:
         raise credentials_exception
-    return user
\ No newline at end of file
+    user = CurrentUser(row.id, row.email, row.name)
+    # Never keep a token cached beyond its own expiry
+    user_cache.put(token, user, ttl=payload.get("exp", 0) - time.time())
+    return user
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme),
+                            db: AsyncSession = Depends(get_async_db)) -> Optional[CurrentUser]:
+    """
+    The caller when a bearer token is sent, else None (for endpoints that
+    only need a user for some options).
+    """
+    if token is None:
+        return None
+    return await get_current_user(token, db)
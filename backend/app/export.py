@@ -0,0 +1,168 @@
+"""
+Streaming export of a user's transaction history.
+
+Rows come off the database cursor in `yield_per` batches as plain tuples
+(no ORM objects, no identity map) and each batch is encoded and handed to
+the response before the next one is fetched, so memory stays flat however
+long the history is.
+"""
+import io
+import os
+import csv
+import zlib
+from enum import Enum
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import Transaction
+from .schemas import TransactionRead
+from .serialization import RowSerializer
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 5000))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", 6))
+
+# Same fields as TransactionRead; NDJSON objects use its field order
+EXPORT_COLUMNS = ("id", "date", "description", "amount", "category", "user_id", "account_id")
+NDJSON_ROWS = RowSerializer(TransactionRead, Transaction)
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+    parquet = "parquet"
+    arrow = "arrow"
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Parquet compresses its own column chunks; gzipping it again buys nothing
+SELF_COMPRESSED = {"parquet"}
+
+class ExportUnavailable(RuntimeError):
+    pass
+
+def check_available(fmt: str) -> None:
+    """
+    Raise ExportUnavailable if the format needs an optional dependency
+    that isn't installed. Call before streaming starts.
+    """
+    if fmt in ("parquet", "arrow"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ExportUnavailable(f"{fmt} export requires pyarrow to be installed")
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header value admits gzip (q > 0), either by
+    name or through `*`.
+    """
+    q = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        q[coding.strip().lower()] = weight
+    weight = q.get("gzip", q.get("x-gzip", q.get("*", 0.0)))
+    return weight > 0
+
+def _batches(db: Session, criteria, batch_size: int, columns) -> Iterator[list]:
+    t = Transaction
+    stmt = (select(*columns)
+            .where(*criteria)
+            .order_by(t.date, t.id)
+            .execution_options(yield_per=batch_size))
+    yield from db.execute(stmt).partitions()
+
+def _ndjson_chunks(batches) -> Iterator[bytes]:
+    for rows in batches:
+        yield NDJSON_ROWS.encode_lines(rows)
+
+def _csv_chunks(batches) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+class _Drain(io.RawIOBase):
+    """
+    Write-only sink whose contents are taken out after every batch, so the
+    Arrow/Parquet writers never hold more than one batch of output.
+    """
+    def __init__(self):
+        self._chunks, self._pos = [], 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        out, self._chunks = b"".join(self._chunks), []
+        return out
+
+def _arrow_chunks(batches, fmt: str) -> Iterator[bytes]:
+    import pyarrow as pa
+    schema = pa.schema([
+        ("id", pa.int64()), ("date", pa.date32()), ("description", pa.string()),
+        ("amount", pa.float64()), ("category", pa.string()), ("user_id", pa.int64()),
+        ("account_id", pa.int64()),
+    ])
+    sink = _Drain()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    for rows in batches:
+        columns = [pa.array(col, type=field.type) for col, field in zip(zip(*rows), schema)]
+        writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def gzip_chunks(chunks, level: int = EXPORT_GZIP_LEVEL) -> Iterator[bytes]:
+    """
+    Gzip a byte stream on the fly.
+    """
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+def export_chunks(db: Session, criteria, fmt: str, gzip: bool = False,
+                  batch_size: int = None) -> Iterator[bytes]:
+    """
+    Encoded export of every transaction matching `criteria`, oldest first.
+    """
+    batch_size = batch_size or EXPORT_BATCH_SIZE
+    if fmt == "ndjson":
+        chunks = _ndjson_chunks(_batches(db, criteria, batch_size, NDJSON_ROWS.columns))
+    else:
+        batches = _batches(db, criteria, batch_size, [getattr(Transaction, c) for c in EXPORT_COLUMNS])
+        chunks = _csv_chunks(batches) if fmt == "csv" else _arrow_chunks(batches, fmt)
+    return gzip_chunks(chunks) if gzip and fmt not in SELF_COMPRESSED else chunks
@@ -0,0 +1,168 @@
+import os
+import uuid
+import shutil
+import logging
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from .db import SessionLocal
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+# Worker processes running imports (also the global cap on running jobs),
+# and how many jobs may be queued or running, per user and overall
+IMPORT_WORKERS          = int(os.getenv('IMPORT_WORKERS', 2))
+MAX_ACTIVE_JOBS         = int(os.getenv('MAX_ACTIVE_JOBS', 8))
+MAX_ACTIVE_JOBS_PER_USER = int(os.getenv('MAX_ACTIVE_JOBS_PER_USER', 2))
+# Running jobs whose heartbeat is older than this, and queued jobs this old
+# while no import is making progress, are presumed lost (worker died, or
+# orphaned by a restart) and marked failed
+IMPORT_JOB_TIMEOUT      = timedelta(seconds=int(os.getenv('IMPORT_JOB_TIMEOUT', 3600)))
+UPLOAD_DIR              = os.getenv('UPLOAD_DIR', './uploads')
+
+ACTIVE_STATES = ("queued", "running")
+
+_executor = None
+
+class JobLimitExceeded(Exception):
+    pass
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent is a multi-threaded server process
+        _executor = ProcessPoolExecutor(
+            max_workers=IMPORT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def fail_stale_jobs(db: Session) -> int:
+    """
+    Mark lost jobs failed, so they reach a terminal state: running jobs
+    with no heartbeat (`updated_at`) for IMPORT_JOB_TIMEOUT, and jobs
+    queued that long while no running job has made progress either (a
+    queue moving behind long imports is not lost). Returns how many were.
+    """
+    now = datetime.utcnow()
+    cutoff = now - IMPORT_JOB_TIMEOUT
+    j = ImportJob
+    heartbeat = func.coalesce(j.updated_at, j.started_at, j.created_at)
+    stale = [and_(j.state == "running", heartbeat < cutoff)]
+    progressing = db.scalar(select(func.count()).select_from(j)
+                            .where(j.state == "running", heartbeat >= cutoff))
+    if not progressing:
+        stale.append(and_(j.state == "queued", j.created_at < cutoff))
+    result = db.execute(
+        update(j)
+        .where(or_(*stale))
+        .values(state="failed", finished_at=now, updated_at=now,
+                error=f"Import made no progress for {int(IMPORT_JOB_TIMEOUT.total_seconds())}s; "
+                      "the worker was lost or the server restarted")
+        .execution_options(synchronize_session=False))
+    db.commit()
+    if result.rowcount:
+        logger.warning("marked %d stale import jobs as failed", result.rowcount)
+    return result.rowcount
+
+def fail_stale_jobs_on_startup() -> int:
+    db = SessionLocal()
+    try:
+        return fail_stale_jobs(db)
+    finally:
+        db.close()
+
+def submit_import(db: Session, user_id: int, fileobj, filename: str, dayfirst: bool = None) -> ImportJob:
+    """
+    Spool an upload to disk, record a queued ImportJob and hand it to the
+    worker pool. Raises JobLimitExceeded when the user or the server
+    already has too many active imports.
+    """
+    fail_stale_jobs(db)
+    active = db.query(ImportJob).filter(ImportJob.state.in_(ACTIVE_STATES))
+    if active.filter(ImportJob.user_id == user_id).count() >= MAX_ACTIVE_JOBS_PER_USER:
+        raise JobLimitExceeded("Too many imports in progress for this user")
+    if active.count() >= MAX_ACTIVE_JOBS:
+        raise JobLimitExceeded("Too many imports in progress")
+
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4().hex}{os.path.splitext(filename)[1].lower()}")
+    with open(path, "wb") as out:
+        shutil.copyfileobj(fileobj, out)
+
+    now = datetime.utcnow()
+    job = ImportJob(user_id=user_id, filename=filename, state="queued", created_at=now, updated_at=now)
+    db.add(job); db.commit(); db.refresh(job)
+
+    future = _get_executor().submit(run_import_job, job.id, user_id, path, filename, dayfirst)
+    future.add_done_callback(_log_failure)
+    return job
+
+def _log_failure(future) -> None:
+    if (exc := future.exception()) is not None:
+        logger.error("import worker crashed: %r", exc)
+
+def _advance(db: Session, job_id: int, expected: str, **values) -> bool:
+    """
+    Update a job only while it is still in the `expected` state, stamping
+    the heartbeat. False when it has moved on (failed as stale elsewhere).
+    """
+    now = datetime.utcnow()
+    result = db.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id, ImportJob.state == expected)
+        .values(updated_at=now, **values)
+        .execution_options(synchronize_session=False))
+    db.commit()
+    return bool(result.rowcount)
+
+def run_import_job(job_id: int, user_id: int, path: str, filename: str, dayfirst: bool = None) -> None:
+    """
+    Worker-process entry point: stream the spooled file through import and
+    bulk persistence, recording progress on the job row after each chunk.
+    Every write is conditional on the job's state, so a job already
+    failed as stale is neither started, nor continued, nor marked done.
+    """
+    from .categorize import iter_import_transactions
+    from .bulk import bulk_insert_transactions
+    from .profiles import ProfileStore
+
+    db = SessionLocal()
+    j = ImportJob
+    try:
+        if not _advance(db, job_id, "queued", state="running", started_at=datetime.utcnow()):
+            logger.warning("import job %s is no longer queued; skipping it", job_id)
+            return
+        try:
+            occurrences = {}
+            for chunk in iter_import_transactions(path, filename, dayfirst=dayfirst, profiles=ProfileStore(db)):
+                result = bulk_insert_transactions(db, chunk, user_id, occurrences=occurrences)
+                if not _advance(db, job_id, "running",
+                                rows_processed=j.rows_processed + len(chunk),
+                                rows_rejected=j.rows_rejected + result["rejected"],
+                                inserted=j.inserted + result["inserted"],
+                                skipped=j.skipped + result["skipped"]):
+                    logger.warning("import job %s was failed elsewhere; stopping", job_id)
+                    return
+            _advance(db, job_id, "running", state="done", finished_at=datetime.utcnow())
+        except Exception as e:
+            db.rollback()
+            logger.exception("import job %s failed", job_id)
+            _advance(db, job_id, "running", state="failed", error=str(e), finished_at=datetime.utcnow())
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,118 @@
+"""
+HTTP load test for the read endpoints of a running server.
+
+Registers a throwaway user, seeds it with synthetic transactions, then
+keeps `--concurrency` clients requesting the read endpoints round-robin
+for `--duration` seconds and reports throughput and latency percentiles.
+Compare runs at the same uvicorn worker count.
+
+    uvicorn app.main:app --workers 1 &
+    python -m app.loadtest --url http://127.0.0.1:8000 --concurrency 64 --duration 20
+
+Needs httpx (not a runtime dependency of the app).
+"""
+import io
+import sys
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import datetime
+
+DEFAULT_PATHS = (
+    "/api/transactions?limit=100",
+    "/api/reports/summary?month=2024-03",
+    "/api/reports/summary?start=2024-02-10&end=2024-05-20",
+    "/api/reports/trends?granularity=week&start=2024-01-01&end=2024-06-30",
+    "/api/categories/",
+    "/api/categories/Groceries/transactions?limit=50",
+    "/api/goals",
+    "/api/budgets/",
+)
+
+def _seed_csv(rows: int) -> bytes:
+    rng = random.Random(0)
+    merchants = ["CARREFOUR MALL", "Amazon.ae", "du telecom", "salary acme", "uber trip", "netflix"]
+    buf = io.StringIO()
+    buf.write("Date,Description,Amount,SourceID\n")
+    day = datetime.date(2024, 1, 1)
+    for i in range(rows):
+        d = day + datetime.timedelta(days=rng.randrange(366))
+        amount = round(rng.uniform(-900, 300), 2)
+        buf.write(f"{d.isoformat()},{rng.choice(merchants)} {i},{amount},1\n")
+    return buf.getvalue().encode()
+
+async def _setup(client, seed_rows: int) -> dict:
+    email = f"loadtest-{uuid.uuid4().hex[:8]}@example.com"
+    r = await client.post("/api/register", json={"email": email, "password": "loadtest", "name": "load"})
+    r.raise_for_status()
+    r = await client.post("/api/login", data={"username": email, "password": "loadtest"})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['token']}"}
+    if seed_rows:
+        r = await client.post("/api/transactions/upload", headers=headers, timeout=600,
+                              files={"file": ("seed.csv", _seed_csv(seed_rows), "text/csv")})
+        r.raise_for_status()
+    return headers
+
+async def _run(url: str, concurrency: int, duration: float, seed_rows: int, paths) -> dict:
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        headers = await _setup(client, seed_rows)
+        latencies, errors = [], 0
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int):
+            nonlocal errors
+            i = n
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(path, headers=headers)
+                    ok = r.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - t0)
+                else:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+    return {
+        "requests": len(latencies), "errors": errors, "seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99),
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.loadtest")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="endpoint to include (repeatable); defaults to the read endpoints")
+    args = parser.parse_args(argv)
+
+    r = asyncio.run(_run(args.url, args.concurrency, args.duration, args.seed_rows,
+                         tuple(args.paths or DEFAULT_PATHS)))
+    print(f"{r['requests']} requests in {r['seconds']:.1f}s at concurrency {args.concurrency}: "
+          f"{r['rps']:.0f} req/s, p50 {r['p50_ms']:.1f} ms, p95 {r['p95_ms']:.1f} ms, "
+          f"p99 {r['p99_ms']:.1f} ms, {r['errors']} errors")
+    return 1 if r["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,15 @@
+import time
+import logging
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from .db import engine, Base
+from contextlib import asynccontextmanager
+from .db import engine
+from . import jobs, migrations, passwords, startup
+from .queries import NEXT_CURSOR_HEADER
 from .routers import (
     auth,
     accounts,
@@ -9,13 +18,30 @@ from .routers import (
     goals,
     analysis,
     budgets,
+    metrics,
 )
 
-# Create all database tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create missing tables and apply pending schema migrations
+    t0 = time.perf_counter()
+    await run_in_threadpool(migrations.upgrade, engine)
+    await run_in_threadpool(jobs.fail_stale_jobs_on_startup)
+    timings = {"import": _import_seconds, "migrations": time.perf_counter() - t0}
+    if startup.WARMUP_ON_STARTUP:
+        t0 = time.perf_counter()
+        await run_in_threadpool(startup.warm_up)
+        timings["warm_up"] = time.perf_counter() - t0
+    logger.info("worker started: %s", ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
+    yield
+    # Stop the import worker pool, if any imports were started
+    jobs.shutdown()
+    passwords.shutdown()
 
 # Initialize FastAPI app
-app = FastAPI(title="MyFinAppV3 API")
+app = FastAPI(title="MyFinAppV3 API", lifespan=lifespan)
 
 # CORS configuration (adjust origins when you deploy)
 app.add_middleware(
@@ -24,6 +50,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
     allow_credentials=True,
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Mount API routers under /api
@@ -33,4 +60,7 @@ app.include_router(transactions.router, prefix="/api", tags=["Transactions"])
 app.include_router(categories.router,   prefix="/api", tags=["Categories"])
 app.include_router(goals.router,        prefix="/api", tags=["Goals"])
 app.include_router(analysis.router,     prefix="/api", tags=["Reports"])
-app.include_router(budgets.router,      prefix="/api", tags=["Budgets"])
\ No newline at end of file
+app.include_router(budgets.router,      prefix="/api", tags=["Budgets"])
+app.include_router(metrics.router,      prefix="/api", tags=["Metrics"])
+
+_import_seconds = time.perf_counter() - _import_started
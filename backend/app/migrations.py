@@ -0,0 +1,193 @@
+"""
+Versioned schema migrations for existing databases.
+
+`Base.metadata.create_all` only creates missing tables, so anything that
+changes an existing table (indexes, columns, backfills) is a numbered step
+here. The applied version is kept in SQLite's `PRAGMA user_version`; a
+fresh database gets the full schema from the models and is stamped with
+the latest version straight away. Steps are idempotent, so an upgrade that
+died half way can simply be run again.
+
+    python -m app.migrations upgrade
+    python -m app.migrations status
+    python -m app.migrations plans
+"""
+import sys
+import logging
+import argparse
+import datetime
+
+from sqlalchemy import inspect, select, update, bindparam, Engine
+from sqlalchemy.orm import Session
+
+from .db import Base
+from .models import Transaction, Budget, Goal, ImportJob
+
+logger = logging.getLogger(__name__)
+
+def _create_indexes(conn, *names: str) -> None:
+    """
+    Create the named indexes as declared on the models, if missing.
+    """
+    wanted = set(names)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in wanted:
+                index.create(conn, checkfirst=True)
+                wanted.discard(index.name)
+    if wanted:
+        raise LookupError(f"indexes not declared on any model: {sorted(wanted)}")
+
+def _report_indexes(conn) -> None:
+    _create_indexes(
+        conn,
+        "ix_transactions_user_date",
+        "ix_transactions_user_category_date",
+        "ix_transactions_user_account_date",
+        "ix_budgets_user_category",
+    )
+
+def _backfill_rollups(conn) -> None:
+    from . import rollups
+    rollups.ensure_built(Session(bind=conn))
+
+def _add_column(conn, table: str, ddl: str) -> None:
+    """
+    ALTER TABLE ... ADD COLUMN unless the column is already there.
+    """
+    name = ddl.split()[0]
+    if name not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+
+BACKFILL_BATCH_SIZE = 5000
+
+def _transaction_fingerprints(conn) -> None:
+    from .bulk import assign_fingerprints
+
+    _add_column(conn, Transaction.__tablename__, "fingerprint VARCHAR")
+    _add_column(conn, ImportJob.__tablename__, "skipped INTEGER NOT NULL DEFAULT 0")
+
+    # Existing rows are fingerprinted in id order as if they were one upload,
+    # so rows that are already duplicated get distinct occurrence indexes
+    t = Transaction
+    source = conn.execute(
+        select(t.id, t.user_id, t.account_id, t.date, t.amount, t.description).order_by(t.id)
+    ).mappings()
+    stmt = update(t.__table__).where(t.__table__.c.id == bindparam("tid")).values(fingerprint=bindparam("fp"))
+    occurrences = {}
+    while batch := [dict(r) for r in source.fetchmany(BACKFILL_BATCH_SIZE)]:
+        assign_fingerprints(batch, occurrences)
+        conn.execute(stmt, [{"tid": r["id"], "fp": r["fingerprint"]} for r in batch])
+    _create_indexes(conn, "uix_transactions_fingerprint")
+
+def _import_job_heartbeat(conn) -> None:
+    _add_column(conn, ImportJob.__tablename__, "updated_at DATETIME")
+
+# (version, description, step) — append only, never renumber
+MIGRATIONS = [
+    (1, "composite report indexes on transactions and budgets", _report_indexes),
+    (2, "backfill monthly rollups", _backfill_rollups),
+    (3, "transaction fingerprints for duplicate detection", _transaction_fingerprints),
+    (4, "import job heartbeat", _import_job_heartbeat),
+]
+
+LATEST = MIGRATIONS[-1][0]
+
+def current_version(conn) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+def _set_version(conn, version: int) -> None:
+    conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+
+def upgrade(engine: Engine) -> list[int]:
+    """
+    Bring the database up to date: create missing tables, then apply every
+    pending migration in order. Returns the versions applied.
+    """
+    with engine.begin() as conn:
+        fresh = not inspect(conn).has_table(Transaction.__tablename__)
+        Base.metadata.create_all(bind=conn)
+        if fresh:
+            _set_version(conn, LATEST)
+            return []
+        version = current_version(conn)
+
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        logger.info("applying migration %d: %s", number, description)
+        with engine.begin() as conn:
+            step(conn)
+            _set_version(conn, number)
+        applied.append(number)
+    return applied
+
+def _hot_queries() -> dict:
+    """
+    The router queries that must stay on an index, built by the same
+    helpers the routers use, with placeholder values.
+    """
+    from .queries import transaction_criteria, page_query, encode_cursor
+    from .routers.analysis import summary_query, trends_queries
+
+    t, uid = Transaction, 1
+    first, last = datetime.date(2024, 1, 1), datetime.date(2024, 3, 31)
+    cursor = encode_cursor(t(date=last, id=1000))
+    return {
+        "list_transactions": page_query(select(t).where(*transaction_criteria(uid, first, last)), 100),
+        "list_transactions_page": page_query(select(t).where(*transaction_criteria(uid)), 100, cursor),
+        "list_transactions_account": page_query(select(t).where(*transaction_criteria(uid, account_id=1)), 100),
+        "transactions_by_category": page_query(select(t).where(*transaction_criteria(uid, category="Groceries")), 100),
+        "summary_rollup": summary_query(uid, month="2024-01"),
+        "summary": summary_query(uid, start="2024-01-10", end="2024-03-20"),
+        "summary_account": summary_query(uid, start="2024-01-10", end="2024-03-20", account_id=1),
+        "trends": trends_queries(uid, "week", "2024-01-01", "2024-03-31")[0],
+        "trends_by_category": trends_queries(uid, "day", "2024-01-01")[1],
+        "trends_rollup": trends_queries(uid, "month", "2024-01-01", "2024-03-31")[0],
+        "list_categories": select(t.category).where(t.user_id == uid).distinct(),
+        "list_budgets": select(Budget).where(Budget.user_id == uid, Budget.year == 2024, Budget.month == 1),
+        "budgets_by_category": select(Budget).where(Budget.user_id == uid, Budget.category == "Groceries"),
+        "list_goals": select(Goal).where(Goal.user_id == uid),
+    }
+
+def check_query_plans(engine: Engine) -> dict:
+    """
+    Run EXPLAIN QUERY PLAN for each hot query. Returns {name: (plan lines,
+    full-scan lines)}; any full-scan line means a query lost its index.
+    """
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in _hot_queries().items():
+            sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+            plan = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+            scans = [line for line in plan if line.startswith("SCAN ") and " USING " not in line]
+            results[name] = (plan, scans)
+    return results
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", choices=["upgrade", "status", "plans"])
+    args = parser.parse_args(argv)
+
+    from .db import engine
+    if args.command == "upgrade":
+        applied = upgrade(engine)
+        print(f"applied migrations: {applied}" if applied else "database is up to date")
+        return 0
+    if args.command == "status":
+        with engine.connect() as conn:
+            version = current_version(conn)
+        print(f"schema version {version} (latest {LATEST})")
+        return 0 if version == LATEST else 1
+
+    upgrade(engine)
+    failed = 0
+    for name, (plan, scans) in check_query_plans(engine).items():
+        print(f"{'FULL SCAN' if scans else 'ok':9} {name}: {'; '.join(plan)}")
+        failed += bool(scans)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, ForeignKey, UniqueConstraint, Index, JSON
+from datetime import datetime
 from sqlalchemy.orm import relationship
 from .db import Base
 
@@ -33,6 +34,16 @@ class Transaction(Base):
     original_cat    = Column(String, nullable=True)
     user_id         = Column(Integer, ForeignKey("users.id"), nullable=False)
     account_id      = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    # Identity of the statement line, for skipping re-uploaded rows (see bulk.py)
+    fingerprint     = Column(String, nullable=True)
+
+    # Every report and listing filters on user first, then date or category
+    __table_args__ = (
+        Index("ix_transactions_user_date", "user_id", "date"),
+        Index("ix_transactions_user_category_date", "user_id", "category", "date"),
+        Index("ix_transactions_user_account_date", "user_id", "account_id", "date"),
+        Index("uix_transactions_fingerprint", "fingerprint", unique=True),
+    )
 
     user            = relationship("User", back_populates="transactions")
     account         = relationship("Account", back_populates="transactions")
@@ -43,6 +54,15 @@ class CategoryOverride(Base):
     keyword     = Column(String, unique=True, nullable=False)
     category    = Column(String, nullable=False)
 
+class RuleVersion(Base):
+    """
+    Named counters bumped whenever a rule table changes, so every worker
+    process can tell its compiled copy is stale.
+    """
+    __tablename__ = "rule_versions"
+    name        = Column(String, primary_key=True)
+    version     = Column(Integer, nullable=False, default=0)
+
 class Goal(Base):
     __tablename__ = "goals"
     id              = Column(Integer, primary_key=True, index=True)
@@ -67,6 +87,55 @@ class Budget(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "year", "month", "category", name="uix_budget_user_month_cat"),
+        Index("ix_budgets_user_category", "user_id", "category"),
     )
 
-    user        = relationship("User", back_populates="budgets")
\ No newline at end of file
+    user        = relationship("User", back_populates="budgets")
+
+class ImportProfile(Base):
+    __tablename__ = "import_profiles"
+    id                  = Column(Integer, primary_key=True, index=True)
+    fingerprint         = Column(String, unique=True, index=True, nullable=False)
+    skip_rows           = Column(Integer, nullable=False, default=0)
+    columns             = Column(JSON, nullable=False, default=dict)
+    date_format         = Column(String, nullable=True)
+    amount_convention   = Column(String, nullable=False, default="signed")
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    id              = Column(Integer, primary_key=True, index=True)
+    user_id         = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    filename        = Column(String, nullable=False)
+    state           = Column(String, nullable=False, default="queued", index=True)
+    rows_processed  = Column(Integer, nullable=False, default=0)
+    rows_rejected   = Column(Integer, nullable=False, default=0)
+    inserted        = Column(Integer, nullable=False, default=0)
+    skipped         = Column(Integer, nullable=False, default=0)
+    error           = Column(String, nullable=True)
+    created_at      = Column(DateTime, nullable=False)
+    started_at      = Column(DateTime, nullable=True)
+    finished_at     = Column(DateTime, nullable=True)
+    # Heartbeat: set on every state change and progress write
+    updated_at      = Column(DateTime, nullable=True)
+
+    @property
+    def elapsed_seconds(self):
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or datetime.utcnow()) - self.started_at).total_seconds()
+
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollups"
+    id          = Column(Integer, primary_key=True, index=True)
+    user_id     = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    account_id  = Column(Integer, nullable=False)
+    year        = Column(Integer, nullable=False)
+    month       = Column(Integer, nullable=False)
+    category    = Column(String, nullable=False)
+    income      = Column(Float, nullable=False, default=0.0)
+    expense     = Column(Float, nullable=False, default=0.0)
+    count       = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "account_id", "year", "month", "category", name="uix_rollup_user_acct_month_cat"),
+    )
@@ -0,0 +1,246 @@
+"""
+Override engine: exact description overrides (overrides.json) plus every
+CategoryOverride keyword from the database, compiled into one
+Aho-Corasick automaton so a description is matched against all rules in
+a single pass over its characters.
+
+Writes to the overrides table bump a counter in `rule_versions` within
+the same transaction; each worker process re-reads that counter at most
+every OVERRIDES_REFRESH_SECONDS and recompiles only when it moved.
+
+`recategorize` re-applies the rules to transactions already stored.
+"""
+import os
+import json
+import time
+import logging
+from collections import deque
+from typing import Optional
+
+from sqlalchemy import and_, case, event, or_, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from .models import CategoryOverride, RuleVersion, Transaction
+from .rollups import apply_deltas, deltas_for_query, deltas_from_rows
+
+logger = logging.getLogger(__name__)
+
+OVERRIDES_FILE = os.path.expanduser(os.getenv(
+    "OVERRIDES_FILE", os.path.join(os.getenv("MODEL_DIR", "~/Documents"), "overrides.json")))
+OVERRIDES_REFRESH_SECONDS = float(os.getenv("OVERRIDES_REFRESH_SECONDS", 1.0))
+VERSION_NAME = "overrides"
+
+# Distinct descriptions rewritten per UPDATE statement (and commit)
+RECATEGORIZE_BATCH_SIZE = int(os.getenv("RECATEGORIZE_BATCH_SIZE", 500))
+
+def normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+class OverrideMatcher:
+    """
+    Exact map first, then keyword containment. When several keywords occur
+    in a description the longest wins, then the oldest rule.
+    """
+
+    def __init__(self, keywords, exact: dict = None, version=None):
+        self.version = version
+        self.exact = {str(k).lower().strip(): v for k, v in (exact or {}).items()}
+        self.size = 0
+        # Trie as parallel lists: transitions, failure link, best output
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]       # (length, -order, category) of the best keyword ending here
+        for order, (keyword, category) in enumerate(keywords):
+            kw = normalize(keyword)
+            if kw:
+                self._add(kw, (len(kw), -order, category))
+                self.size += 1
+        self._link()
+
+    def _add(self, kw: str, out: tuple) -> None:
+        node = 0
+        for ch in kw:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+            node = nxt
+        if self._best[node] is None or out > self._best[node]:
+            self._best[node] = out
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if node else 0
+                # Inherit the best keyword that is a suffix of this one
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None and (self._best[nxt] is None or inherited > self._best[nxt]):
+                    self._best[nxt] = inherited
+                queue.append(nxt)
+
+    def match(self, desc: str) -> Optional[str]:
+        d = str(desc).lower().strip()
+        if d in self.exact:
+            return self.exact[d]
+        if not self.size:
+            return None
+        goto, fail, best_at = self._goto, self._fail, self._best
+        node, best = 0, None
+        for ch in normalize(d):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            out = best_at[node]
+            if out is not None and (best is None or out > best):
+                best = out
+        return best[2] if best else None
+
+    def match_many(self, descs) -> list:
+        return [self.match(d) for d in descs]
+
+# Per-process compiled state
+_exact: Optional[dict] = None
+_exact_version = 0
+_matcher: Optional[OverrideMatcher] = None
+_checked_at = float("-inf")
+
+def set_exact_overrides(mapping: dict) -> None:
+    """
+    Install the exact description -> category map (overrides.json).
+    """
+    global _exact, _exact_version
+    _exact = dict(mapping)
+    _exact_version += 1
+
+def _load_exact() -> dict:
+    try:
+        with open(OVERRIDES_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def stored_version(db) -> int:
+    return db.scalar(select(RuleVersion.version).where(RuleVersion.name == VERSION_NAME)) or 0
+
+def override_matcher() -> OverrideMatcher:
+    """
+    The compiled matcher for this process, rebuilt when the overrides
+    table or the exact map changed.
+    """
+    global _matcher, _checked_at
+    if _exact is None:
+        set_exact_overrides(_load_exact())
+    now = time.monotonic()
+    if _matcher is not None and now - _checked_at < OVERRIDES_REFRESH_SECONDS \
+            and _matcher.version[1] == _exact_version:
+        return _matcher
+
+    from .db import ReadSessionLocal
+    with ReadSessionLocal() as db:
+        version = (stored_version(db), _exact_version)
+        if _matcher is None or version != _matcher.version:
+            rows = db.execute(select(CategoryOverride.keyword, CategoryOverride.category)
+                              .order_by(CategoryOverride.id)).all()
+            t0 = time.perf_counter()
+            _matcher = OverrideMatcher(rows, _exact, version)
+            logger.info("compiled %d override keywords in %.3fs", _matcher.size, time.perf_counter() - t0)
+    _checked_at = now
+    return _matcher
+
+def invalidate() -> None:
+    """
+    Force the next override_matcher() call to re-check the stored version.
+    """
+    global _checked_at
+    _checked_at = float("-inf")
+
+@event.listens_for(CategoryOverride, "after_insert")
+@event.listens_for(CategoryOverride, "after_update")
+@event.listens_for(CategoryOverride, "after_delete")
+def _bump_version(mapper, connection, target):
+    stmt = insert(RuleVersion).values(name=VERSION_NAME, version=1)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=["name"], set_={"version": RuleVersion.version + 1}))
+    invalidate()
+
+def _like_pattern(keyword: str) -> str:
+    # Words in order with anything between them: a superset of what the
+    # matcher accepts, which then decides per description
+    words = [w.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+             for w in normalize(keyword).split()]
+    return "%" + "%".join(words) + "%"
+
+def recategorize(db, user_id: int, keywords, old_category: Optional[str] = None,
+                 batch_size: int = None) -> dict:
+    """
+    Re-apply the current overrides to a user's existing transactions whose
+    description contains any of `keywords` (the rules just written). Rows
+    whose description an override now matches get that override's
+    category. When a rule was changed or removed, pass its previous
+    category as `old_category`: rows the matcher no longer resolves that
+    still carry it go back to the category they were imported with
+    (`original_cat`, which is never touched), or, when that too came from
+    the rule, to what the keyword map and ML fallback give now. Any other
+    row, manual edits included, is left alone. Runs as set-based UPDATEs
+    over batches of descriptions, each committed with its rollup deltas;
+    returns rows changed and elapsed seconds.
+    """
+    t0 = time.perf_counter()
+    batch_size = batch_size or RECATEGORIZE_BATCH_SIZE
+    t = Transaction
+    patterns = [t.description.like(_like_pattern(k), escape="\\") for k in keywords if normalize(k)]
+    if not patterns:
+        return {"changed": 0, "seconds": 0.0}
+    descs = db.scalars(select(t.description).distinct().where(t.user_id == user_id, or_(*patterns))).all()
+
+    invalidate()
+    matcher = override_matcher()
+    targets = [(d, matcher.match(d)) for d in descs]
+    changed = 0
+    for i in range(0, len(targets), batch_size):
+        batch = targets[i:i + batch_size]
+        matched = {d: cat for d, cat in batch if cat is not None}
+        unmatched = [d for d, cat in batch if cat is None] if old_category is not None else []
+        scope = []
+        if matched:
+            scope.append(t.description.in_(list(matched)))
+        if unmatched:
+            scope.append(and_(t.description.in_(unmatched), t.category == old_category))
+        if not scope:
+            continue
+        new_cat = _revert_category(unmatched, old_category)
+        if matched:
+            new_cat = case(matched, value=t.description, else_=new_cat)
+        criteria = [t.user_id == user_id, or_(*scope), t.category.is_distinct_from(new_cat)]
+
+        apply_deltas(db, deltas_for_query(db, *criteria, sign=-1))
+        rows = db.execute(update(t).where(*criteria).values(category=new_cat)
+                          .returning(t.user_id, t.account_id, t.date, t.amount, t.category)
+                          .execution_options(synchronize_session=False)).all()
+        apply_deltas(db, deltas_from_rows([r._asdict() for r in rows]))
+        db.commit()
+        changed += len(rows)
+    return {"changed": changed, "seconds": time.perf_counter() - t0}
+
+def _revert_category(descs: list, old_category: Optional[str]):
+    """
+    Category expression for rows of `descs` that lose `old_category`:
+    `original_cat`, unless the row was imported while the rule existed
+    (original_cat is then the rule's own category) and the non-override
+    rules decide instead.
+    """
+    t = Transaction
+    if not descs:
+        return t.category
+    from .categorize import rule_categories
+    fallback = dict(zip(descs, rule_categories([str(d).lower().strip() for d in descs])))
+    from_rule = or_(t.original_cat.is_(None), t.original_cat == old_category)
+    return case((from_rule, case(fallback, value=t.description, else_=t.category)), else_=t.original_cat)
@@ -0,0 +1,136 @@
+"""
+Password hashing on a dedicated, bounded executor.
+
+bcrypt/argon2 are deliberately slow, so hashing never runs on the event
+loop or the shared request threadpool. It gets its own HASH_WORKERS
+threads, with at most HASH_QUEUE_LIMIT calls waiting behind them. Beyond
+that, callers get HashQueueFull straight away (mapped to 503) instead of
+piling up latency for everyone else.
+
+The scheme and cost come from the environment. Hashes made with an older
+scheme or cost still verify, and login replaces them through
+`verify_and_update`.
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "bcrypt")   # "bcrypt" or "argon2" (needs argon2-cffi)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 65536))   # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", 2))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", 32))
+LATENCY_SAMPLES = 1000
+
+def _schemes() -> list:
+    # Keep bcrypt verifiable after switching to argon2 so old hashes upgrade on login
+    return [PASSWORD_SCHEME] + (["bcrypt"] if PASSWORD_SCHEME != "bcrypt" else [])
+
+pwd_context = CryptContext(
+    schemes=_schemes(),
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    argon2__time_cost=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+class HashQueueFull(RuntimeError):
+    pass
+
+class _HashStats:
+    def __init__(self):
+        self.lock      = threading.Lock()
+        self.in_flight = 0
+        self.running   = 0
+        self.completed = 0
+        self.rejected  = 0
+        self.rehashed  = 0
+        self.samples   = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            samples = sorted(self.samples)
+            in_flight, running = self.in_flight, self.running
+            completed, rejected, rehashed = self.completed, self.rejected, self.rehashed
+
+        def pct(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000 if samples else 0.0
+
+        return {
+            "scheme":      PASSWORD_SCHEME,
+            "workers":     HASH_WORKERS,
+            "queue_limit": HASH_QUEUE_LIMIT,
+            "running":     running,
+            "queued":      in_flight - running,
+            "completed":   completed,
+            "rejected":    rejected,
+            "rehashed":    rehashed,
+            "latency_ms":  {"p50": pct(0.50), "p95": pct(0.95), "max": pct(1.0)},
+        }
+
+_stats = _HashStats()
+_executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pwhash")
+    return _executor
+
+def _timed(fn, *args):
+    with _stats.lock:
+        _stats.running += 1
+    t0 = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        elapsed = time.perf_counter() - t0
+        with _stats.lock:
+            _stats.running -= 1
+            _stats.completed += 1
+            _stats.samples.append(elapsed)
+
+async def _submit(fn, *args):
+    with _stats.lock:
+        if _stats.in_flight >= HASH_WORKERS + HASH_QUEUE_LIMIT:
+            _stats.rejected += 1
+            raise HashQueueFull("Too many concurrent password operations, try again shortly")
+        _stats.in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), _timed, fn, *args)
+    finally:
+        with _stats.lock:
+            _stats.in_flight -= 1
+
+async def hash_password(password: str) -> str:
+    return await _submit(pwd_context.hash, password)
+
+async def verify_password(password: str, hashed: str):
+    """
+    Returns (valid, replacement hash or None). A replacement is produced
+    when `hashed` uses an outdated scheme or cost; store it.
+    """
+    valid, new_hash = await _submit(pwd_context.verify_and_update, password, hashed)
+    if new_hash is not None:
+        with _stats.lock:
+            _stats.rehashed += 1
+    return valid, new_hash
+
+def stats() -> dict:
+    return _stats.snapshot()
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,56 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import ImportProfile
+
+# Profiles already seen by this worker, keyed by header fingerprint
+_known: dict[str, dict] = {}
+
+def _as_dict(p: ImportProfile) -> dict:
+    return {
+        "fingerprint":       p.fingerprint,
+        "skip_rows":         p.skip_rows,
+        "columns":           dict(p.columns or {}),
+        "date_format":       p.date_format,
+        "amount_convention": p.amount_convention,
+    }
+
+class ProfileStore:
+    """
+    Bank-format profiles (header row, column mapping, date format, amount
+    convention) cached in the DB by header fingerprint, so repeat uploads
+    of a known layout skip format detection.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def find(self, fingerprints: list[str]) -> dict[str, dict]:
+        found = {fp: _known[fp] for fp in fingerprints if fp in _known}
+        missing = [fp for fp in fingerprints if fp not in found]
+        if missing:
+            rows = self.db.query(ImportProfile).filter(ImportProfile.fingerprint.in_(missing)).all()
+            for p in rows:
+                found[p.fingerprint] = _known[p.fingerprint] = _as_dict(p)
+        return found
+
+    def save(self, profile: dict) -> None:
+        try:
+            self._save(profile)
+        except IntegrityError:
+            # another worker stored the same layout first: update theirs
+            self.db.rollback()
+            self._save(profile)
+        _known[profile["fingerprint"]] = {k: profile[k] for k in (
+            "fingerprint", "skip_rows", "columns", "date_format", "amount_convention")}
+
+    def _save(self, profile: dict) -> None:
+        p = self.db.query(ImportProfile).filter(ImportProfile.fingerprint == profile["fingerprint"]).first()
+        if p is None:
+            p = ImportProfile(fingerprint=profile["fingerprint"])
+            self.db.add(p)
+        p.skip_rows = profile["skip_rows"]
+        p.columns = profile["columns"]
+        p.date_format = profile["date_format"]
+        p.amount_convention = profile["amount_convention"]
+        self.db.commit()
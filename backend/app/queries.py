@@ -0,0 +1,91 @@
+"""
+Shared transaction filters and keyset pagination for listing endpoints.
+
+Pages are ordered newest first on (date, id) and continue from an opaque
+cursor holding the last row's key, so every page is one index range scan
+no matter how deep it is.
+"""
+import os
+import base64
+import datetime
+from typing import Optional
+
+from sqlalchemy import tuple_
+
+from .models import Transaction
+
+DEFAULT_PAGE_SIZE = int(os.getenv("TRANSACTIONS_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("TRANSACTIONS_MAX_PAGE_SIZE", 1000))
+
+# Most rows a single batch update/delete may touch
+BATCH_MUTATION_LIMIT = int(os.getenv("TRANSACTIONS_BATCH_LIMIT", 10000))
+
+# Response header carrying the cursor for the next page (absent on the last one)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class InvalidCursor(ValueError):
+    pass
+
+def transaction_criteria(
+    user_id: int,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    account_id: Optional[int] = None,
+    category: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    description: Optional[str] = None,
+) -> list:
+    """
+    WHERE criteria for a user's transactions; `start`/`end` are inclusive
+    and `description` is a case-insensitive substring.
+    """
+    t = Transaction
+    criteria = [t.user_id == user_id]
+    if start is not None:
+        criteria.append(t.date >= start)
+    if end is not None:
+        criteria.append(t.date <= end)
+    if account_id is not None:
+        criteria.append(t.account_id == account_id)
+    if category is not None:
+        criteria.append(t.category == category)
+    if min_amount is not None:
+        criteria.append(t.amount >= min_amount)
+    if max_amount is not None:
+        criteria.append(t.amount <= max_amount)
+    if description:
+        criteria.append(t.description.icontains(description, autoescape=True))
+    return criteria
+
+def encode_cursor(tx) -> str:
+    raw = f"{tx.date.isoformat()}|{tx.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, tx_id = raw.split("|")
+        return datetime.date.fromisoformat(day), int(tx_id)
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+def page_query(stmt, limit: int, cursor: Optional[str] = None):
+    """
+    `stmt` narrowed to one keyset page (plus one row to detect a next page).
+    """
+    t = Transaction
+    if cursor:
+        stmt = stmt.where(tuple_(t.date, t.id) < decode_cursor(cursor))
+    return stmt.order_by(t.date.desc(), t.id.desc()).limit(limit + 1)
+
+async def paginate(db, stmt, limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    Run a Transaction select with keyset pagination. Returns the page and
+    the cursor for the next one (None when this is the last page).
+    """
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    rows = (await db.execute(page_query(stmt, limit, cursor))).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
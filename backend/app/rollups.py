@@ -0,0 +1,182 @@
+"""
+Monthly rollups: income, expense and count per (user, account, year,
+month, category), kept in step with `transactions` by every write path
+so reports never have to scan raw rows.
+
+    python -m app.rollups verify [--user ID]
+    python -m app.rollups rebuild [--user ID]
+"""
+import sys
+import argparse
+
+from sqlalchemy import func, case, cast, delete, select, Integer
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .models import MonthlyRollup, Transaction
+
+KEY = ("user_id", "account_id", "year", "month", "category")
+TOLERANCE = 1e-6
+
+def _aggregate_columns():
+    t = Transaction
+    return (
+        t.user_id,
+        t.account_id,
+        cast(func.strftime("%Y", t.date), Integer).label("year"),
+        cast(func.strftime("%m", t.date), Integer).label("month"),
+        t.category,
+        func.sum(case((t.amount >= 0, t.amount), else_=0.0)).label("income"),
+        func.sum(case((t.amount < 0, -t.amount), else_=0.0)).label("expense"),
+        func.count().label("count"),
+    )
+
+def apply_deltas(db: Session, deltas: list[dict]) -> None:
+    """
+    Add income/expense/count deltas to their rollup rows (upsert), within
+    the caller's transaction. Rows that drop to zero transactions go away.
+    """
+    if not deltas:
+        return
+    stmt = insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(KEY),
+        set_={
+            "income":  MonthlyRollup.income + stmt.excluded.income,
+            "expense": MonthlyRollup.expense + stmt.excluded.expense,
+            "count":   MonthlyRollup.count + stmt.excluded.count,
+        },
+    )
+    db.execute(stmt, deltas)
+    if any(d["count"] < 0 for d in deltas):
+        users = {d["user_id"] for d in deltas}
+        db.execute(delete(MonthlyRollup).where(MonthlyRollup.user_id.in_(users), MonthlyRollup.count <= 0))
+
+def deltas_from_rows(rows: list[dict], sign: int = 1) -> list[dict]:
+    """
+    Rollup deltas for transaction row mappings (as used by bulk inserts).
+    """
+    if not rows:
+        return []
+    import pandas as pd
+
+    df = pd.DataFrame(rows, columns=["user_id", "account_id", "date", "amount", "category"])
+    dates = pd.to_datetime(df["date"])
+    df["year"], df["month"] = dates.dt.year, dates.dt.month
+    df["income"] = df["amount"].clip(lower=0)
+    df["expense"] = (-df["amount"]).clip(lower=0)
+    df["count"] = 1
+    grouped = df.groupby(list(KEY), as_index=False)[["income", "expense", "count"]].sum()
+    return [
+        {**{k: _native(r[k]) for k in KEY},
+         "income": sign * float(r["income"]), "expense": sign * float(r["expense"]),
+         "count": sign * int(r["count"])}
+        for r in grouped.to_dict("records")
+    ]
+
+def deltas_for_transactions(txs, sign: int = 1) -> list[dict]:
+    """
+    Rollup deltas for ORM Transaction objects (single-row write paths).
+    """
+    return deltas_from_rows([
+        {"user_id": t.user_id, "account_id": t.account_id, "date": t.date,
+         "amount": t.amount, "category": t.category}
+        for t in txs
+    ], sign)
+
+def deltas_for_query(db: Session, *criteria, sign: int = 1) -> list[dict]:
+    """
+    Rollup deltas for every transaction matching `criteria`, aggregated in
+    SQL. Take these before a set-based UPDATE/DELETE touches the rows.
+    """
+    cols = _aggregate_columns()
+    rows = db.execute(select(*cols).where(*criteria).group_by(*cols[:5])).all()
+    return [
+        {"user_id": r.user_id, "account_id": r.account_id, "year": r.year, "month": r.month,
+         "category": r.category, "income": sign * r.income, "expense": sign * r.expense,
+         "count": sign * r.count}
+        for r in rows
+    ]
+
+def _native(value):
+    return value.item() if hasattr(value, "item") else value
+
+def rebuild(db: Session, user_id: int = None) -> int:
+    """
+    Recompute rollups from scratch (for one user or everyone). Returns the
+    number of rollup rows written.
+    """
+    q = delete(MonthlyRollup)
+    if user_id is not None:
+        q = q.where(MonthlyRollup.user_id == user_id)
+    db.execute(q)
+    cols = _aggregate_columns()
+    source = select(*cols).group_by(*cols[:5])
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+    db.execute(insert(MonthlyRollup).from_select(
+        ["user_id", "account_id", "year", "month", "category", "income", "expense", "count"], source))
+    db.commit()
+    q = db.query(func.count(MonthlyRollup.id))
+    if user_id is not None:
+        q = q.filter(MonthlyRollup.user_id == user_id)
+    return q.scalar()
+
+def verify(db: Session, user_id: int = None) -> list[dict]:
+    """
+    Compare the rollup table with a fresh aggregate of `transactions` and
+    return every key whose stored values drifted.
+    """
+    cols = _aggregate_columns()
+    source = select(*cols).group_by(*cols[:5])
+    stored = db.query(MonthlyRollup)
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+        stored = stored.filter(MonthlyRollup.user_id == user_id)
+
+    expected = {tuple(getattr(r, k) for k in KEY): r for r in db.execute(source).all()}
+    actual = {tuple(getattr(r, k) for k in KEY): r for r in stored}
+    drift = []
+    for key in expected.keys() | actual.keys():
+        e, a = expected.get(key), actual.get(key)
+        want = (e.income, e.expense, e.count) if e else (0.0, 0.0, 0)
+        have = (a.income, a.expense, a.count) if a else (0.0, 0.0, 0)
+        if (abs(want[0] - have[0]) > TOLERANCE or abs(want[1] - have[1]) > TOLERANCE
+                or want[2] != have[2]):
+            drift.append({**dict(zip(KEY, key)),
+                          "expected": dict(zip(("income", "expense", "count"), want)),
+                          "stored": dict(zip(("income", "expense", "count"), have))})
+    return drift
+
+def ensure_built(db: Session) -> None:
+    """
+    Backfill the rollups once for databases that predate them.
+    """
+    if db.query(MonthlyRollup.id).first() is None and db.query(Transaction.id).first() is not None:
+        rebuild(db)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.rollups")
+    parser.add_argument("command", choices=["verify", "rebuild"])
+    parser.add_argument("--user", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from .db import SessionLocal, engine
+    from .migrations import upgrade
+    upgrade(engine)
+    db = SessionLocal()
+    try:
+        drift = verify(db, args.user)
+        print(f"{len(drift)} rollup rows drifted")
+        for d in drift[:50]:
+            print(d)
+        if args.command == "rebuild":
+            rows = rebuild(db, args.user)
+            print(f"rebuilt {rows} rollup rows")
+            return 0
+        return 1 if drift else 0
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
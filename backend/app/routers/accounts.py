@@ -1,15 +1,21 @@
 from typing import List
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas import AccountCreate, AccountRead
 from ..models import Account
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_async_db, get_current_user
+from ..serialization import RowSerializer
 
 router = APIRouter()
 
+ACCOUNT_ROWS = RowSerializer(AccountRead, Account)
+
 @router.get("/accounts", response_model=List[AccountRead])
-def get_accounts(current_user=Depends(get_current_user), db: Session = Depends(get_db)):
-    return db.query(Account).filter(Account.user_id == current_user.id).all()
+async def get_accounts(current_user=Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    rows = (await db.execute(select(*ACCOUNT_ROWS.columns).where(Account.user_id == current_user.id))).all()
+    return ACCOUNT_ROWS.response(rows)
 
 @router.post("/accounts", response_model=AccountRead)
 def create_account(account: AccountCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
@@ -1,59 +1,232 @@
-from typing import Dict
+from typing import TYPE_CHECKING, Optional
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import func, case, cast, select, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
 import datetime
+from enum import Enum
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 from ..schemas import SummaryReport, TrendsReport
-from ..models import Transaction
-from ..dependencies import get_db, get_current_user
+from ..models import Transaction, MonthlyRollup
+from ..dependencies import get_async_db, get_current_user
 
 router = APIRouter()
 
-@router.get("/reports/summary", response_model=SummaryReport)
-def get_summary(month: str = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    q = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+def _month_range(month: str):
+    year, mon = map(int, month.split("-"))
+    start = datetime.date(year, mon, 1)
+    end = datetime.date(year + 1, 1, 1) if mon == 12 else datetime.date(year, mon + 1, 1)
+    return start, end
+
+def _rollup_span(month: str = None, start: str = None, end: str = None):
+    """
+    The (first, last) YYYYMM span a report covers if it can be served from
+    the monthly rollups (None for an open end), or None when the range cuts
+    through a month and raw transactions must be scanned.
+    """
     if month:
+        if start or end:
+            return None
         year, mon = map(int, month.split("-"))
-        start = datetime.date(year, mon, 1)
-        end = datetime.date(year + 1, 1, 1) if mon == 12 else datetime.date(year, mon + 1, 1)
-        q = q.filter(Transaction.date >= start, Transaction.date < end)
-
-    txs = q.all()
-    total_by_cat: Dict[str, float] = {}
-    total_income = 0.0
-    total_expense = 0.0
-
-    for t in txs:
-        total_by_cat.setdefault(t.category, 0.0)
-        total_by_cat[t.category] += t.amount
-        if t.amount >= 0:
-            total_income += t.amount
-        else:
-            total_expense += abs(t.amount)
+        return year * 100 + mon, year * 100 + mon
+    first = last = None
+    if start:
+        s = datetime.date.fromisoformat(start)
+        if s.day != 1:
+            return None
+        first = s.year * 100 + s.month
+    if end:
+        e = datetime.date.fromisoformat(end)
+        if (e + datetime.timedelta(days=1)).day != 1:
+            return None
+        last = e.year * 100 + e.month
+    return first, last
 
+def _rollup_filters(user_id: int, span, account_id: Optional[int] = None) -> list:
+    ym = MonthlyRollup.year * 100 + MonthlyRollup.month
+    filters = [MonthlyRollup.user_id == user_id]
+    if span[0] is not None:
+        filters.append(ym >= span[0])
+    if span[1] is not None:
+        filters.append(ym <= span[1])
+    if account_id is not None:
+        filters.append(MonthlyRollup.account_id == account_id)
+    return filters
+
+def summary_query(user_id: int, month: str = None, start: str = None, end: str = None,
+                  account_id: Optional[int] = None):
+    """
+    (category, net, income, expense) rows for the summary report: from the
+    monthly rollups for whole-month ranges, else from raw transactions.
+    """
+    span = _rollup_span(month, start, end)
+    if span is not None:
+        r = MonthlyRollup
+        income, expense = func.sum(r.income), func.sum(r.expense)
+        q = (select(r.category, income - expense, income, expense)
+               .where(*_rollup_filters(user_id, span, account_id))
+               .group_by(r.category))
+    else:
+        income  = func.sum(case((Transaction.amount >= 0, Transaction.amount), else_=0.0))
+        expense = func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0.0))
+        q = (select(Transaction.category, func.sum(Transaction.amount), income, expense)
+               .where(Transaction.user_id == user_id))
+        if month:
+            first, after = _month_range(month)
+            q = q.where(Transaction.date >= first, Transaction.date < after)
+        if start:
+            q = q.where(Transaction.date >= datetime.date.fromisoformat(start))
+        if end:
+            q = q.where(Transaction.date <= datetime.date.fromisoformat(end))
+        if account_id is not None:
+            q = q.where(Transaction.account_id == account_id)
+        q = q.group_by(Transaction.category)
+    return q
+
+@router.get("/reports/summary", response_model=SummaryReport)
+async def get_summary(
+    month: str = None,
+    start: str = None,
+    end: str = None,
+    account_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Totals per category plus overall income/expense. Whole-month ranges
+    read the monthly rollups; other ranges aggregate raw transactions in
+    SQL. Filter by a single `month` (YYYY-MM) or an inclusive
+    `start`/`end` date range, and optionally by account.
+    """
+    rows = (await db.execute(summary_query(current_user.id, month, start, end, account_id))).all()
     return {
-        "totalByCategory": total_by_cat,
-        "totalIncome": total_income,
-        "totalExpense": total_expense
+        "totalByCategory": {cat: total for cat, total, _, _ in rows},
+        "totalIncome": float(sum(inc for _, _, inc, _ in rows)),
+        "totalExpense": float(sum(exp for _, _, _, exp in rows))
     }
 
-@router.get("/reports/trends", response_model=TrendsReport)
-def get_trends(start: str = None, end: str = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    q = db.query(Transaction).filter(Transaction.user_id == current_user.id)
-    if start:
-        q = q.filter(Transaction.date >= datetime.date.fromisoformat(start))
-    if end:
-        q = q.filter(Transaction.date <= datetime.date.fromisoformat(end))
+class Granularity(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+    year = "year"
+
+# pandas period frequency per granularity, for gap filling
+PERIOD_FREQ = {"day": "D", "week": "W-SUN", "month": "M", "quarter": "Q", "year": "Y"}
+
+def _period_expr(granularity: str):
+    """
+    SQL expression truncating Transaction.date to a period key: YYYY-MM-DD
+    (days, and weeks keyed by their Monday), YYYY-MM, YYYY-Qn or YYYY.
+    """
+    d = Transaction.date
+    if granularity == "day":
+        return func.strftime("%Y-%m-%d", d)
+    if granularity == "week":
+        return func.date(d, "weekday 0", "-6 days")
+    if granularity == "quarter":
+        quarter = (cast(func.strftime("%m", d), Integer) + 2) / 3
+        return func.printf("%s-Q%d", func.strftime("%Y", d), quarter)
+    if granularity == "year":
+        return func.strftime("%Y", d)
+    return func.strftime("%Y-%m", d)
+
+def _rollup_period_expr(granularity: str):
+    """
+    `_period_expr` for rollup rows (month, quarter and year only).
+    """
+    r = MonthlyRollup
+    if granularity == "quarter":
+        return func.printf("%04d-Q%d", r.year, (r.month + 2) / 3)
+    if granularity == "year":
+        return func.printf("%04d", r.year)
+    return func.printf("%04d-%02d", r.year, r.month)
+
+def _period_key(period: "pd.Period", granularity: str) -> str:
+    if granularity == "week":
+        return period.start_time.strftime("%Y-%m-%d")
+    if granularity == "quarter":
+        return f"{period.year}-Q{period.quarter}"
+    return period.strftime({"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}[granularity])
+
+def _period_keys(first: str, last: str, granularity: str) -> list[str]:
+    """
+    Every period key from `first` to `last` (dates or keys) inclusive.
+    """
+    import pandas as pd
+
+    freq = PERIOD_FREQ[granularity]
+    periods = pd.period_range(pd.Period(first.replace("-Q", "Q"), freq=freq),
+                              pd.Period(last.replace("-Q", "Q"), freq=freq), freq=freq)
+    return [_period_key(p, granularity) for p in periods]
+
+def trends_queries(user_id: int, granularity: str, start: str = None, end: str = None) -> tuple:
+    """
+    The trends report's statements: (period, income, expense) totals and
+    (period, category, net) rows, from the rollups when possible.
+    """
+    g = granularity
+    span = _rollup_span(start=start, end=end) if g in ("month", "quarter", "year") else None
+    if span is not None:
+        r = MonthlyRollup
+        period = _rollup_period_expr(g).label("period")
+        filters = _rollup_filters(user_id, span)
+        income, expense = func.sum(r.income), func.sum(r.expense)
+        net, category = func.sum(r.income - r.expense), r.category
+    else:
+        period = _period_expr(g).label("period")
+        filters = [Transaction.user_id == user_id]
+        if start:
+            filters.append(Transaction.date >= datetime.date.fromisoformat(start))
+        if end:
+            filters.append(Transaction.date <= datetime.date.fromisoformat(end))
+        income  = func.sum(case((Transaction.amount >= 0, Transaction.amount), else_=0.0))
+        expense = func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0.0))
+        net, category = func.sum(Transaction.amount), Transaction.category
+    totals = select(period, income, expense).where(*filters).group_by(period).order_by(period)
+    by_category = select(period, category, net).where(*filters).group_by(period, category)
+    return totals, by_category
+
+@router.get("/reports/trends", response_model=TrendsReport, response_model_exclude_none=True)
+async def get_trends(
+    start: str = None,
+    end: str = None,
+    granularity: Granularity = Granularity.month,
+    by_category: bool = False,
+    fill_gaps: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Income/expense per period, grouped in SQL by a date-truncation
+    expression, or read from the monthly rollups for month, quarter and
+    year granularity over whole months. Empty periods between the first
+    and last one (or the requested range) are filled with zeros;
+    `by_category` adds the net amount per category for each period.
+    """
+    g = granularity.value
+    totals_q, by_category_q = trends_queries(current_user.id, g, start, end)
+
+    import pandas as pd  # deferred: only trends needs it
 
-    txs = q.all()
-    trends: Dict[str, Dict[str, float]] = {}
+    rows = (await db.execute(totals_q)).all()
+    totals = pd.DataFrame(rows, columns=["period", "income", "expense"]).set_index("period")
 
-    for t in txs:
-        key = t.date.strftime("%Y-%m")
-        entry = trends.setdefault(key, {"income": 0.0, "expense": 0.0})
-        if t.amount >= 0:
-            entry["income"] += t.amount
-        else:
-            entry["expense"] += abs(t.amount)
+    if fill_gaps and (start or end or not totals.empty):
+        first = start or (totals.index[0] if not totals.empty else end)
+        last = end or (totals.index[-1] if not totals.empty else start)
+        totals = totals.reindex(_period_keys(first, last, g), fill_value=0.0)
+    trends = {key: {"income": float(inc), "expense": float(exp)}
+              for key, inc, exp in totals.itertuples()}
 
-    return {"trends": dict(sorted(trends.items()))}
\ No newline at end of file
+    result = {"trends": trends}
+    if by_category:
+        cat_rows = (await db.execute(by_category_q)).all()
+        breakdown = {key: {} for key in trends}
+        for key, cat, total in cat_rows:
+            breakdown.setdefault(key, {})[cat] = total
+        result["byCategory"] = breakdown
+    return result
@@ -2,6 +2,7 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
@@ -9,22 +10,47 @@ from ..schemas import UserCreate, UserRead, Token
 from ..models import User
 from ..dependencies import get_db
 from ..security import create_access_token
-from passlib.context import CryptContext
+from ..passwords import hash_password, verify_password, HashQueueFull
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def _busy(e: HashQueueFull) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e),
+                         headers={"Retry-After": "1"})
+
+# Both endpoints are async so hashing waits on its own executor without
+# holding a threadpool thread; the (short) DB work goes to the threadpool.
 
 @router.post("/register", response_model=UserRead)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    hashed = pwd_context.hash(user.password)
-    db_user = User(email=user.email, hashed_pw=hashed, name=user.name)
-    db.add(db_user); db.commit(); db.refresh(db_user)
-    return db_user
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    try:
+        hashed = await hash_password(user.password)
+    except HashQueueFull as e:
+        raise _busy(e)
+
+    def save():
+        db_user = User(email=user.email, hashed_pw=hashed, name=user.name)
+        db.add(db_user); db.commit(); db.refresh(db_user)
+        return db_user
+    return await run_in_threadpool(save)
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == form_data.username).first()
-    if not db_user or not pwd_context.verify(form_data.password, db_user.hashed_pw):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == form_data.username).first())
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    try:
+        valid, new_hash = await verify_password(form_data.password, db_user.hashed_pw)
+    except HashQueueFull as e:
+        raise _busy(e)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = create_access_token({"sub": db_user.email})
-    return {"token": access_token}
\ No newline at end of file
+    if new_hash:
+        # Hash parameters changed since this one was made; store the upgrade
+        def rehash():
+            db_user.hashed_pw = new_hash
+            db.commit()
+        await run_in_threadpool(rehash)
+    access_token = create_access_token({"sub": db_user.email, "uid": db_user.id})
+    return {"token": access_token}
@@ -1,28 +1,33 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas import BudgetCreate, BudgetRead, BudgetUpdate
 from ..models import Budget
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_async_db, get_current_user
+from ..serialization import RowSerializer
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
+BUDGET_ROWS = RowSerializer(BudgetRead, Budget)
+
 @router.get("/", response_model=List[BudgetRead])
-def list_budgets(
+async def list_budgets(
     year: Optional[int] = None,
     month: Optional[int] = None,
     category: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user=Depends(get_current_user)
 ):
-    query = db.query(Budget).filter(Budget.user_id == current_user.id)
+    query = select(*BUDGET_ROWS.columns).where(Budget.user_id == current_user.id)
     if year is not None:
-        query = query.filter(Budget.year == year)
+        query = query.where(Budget.year == year)
     if month is not None:
-        query = query.filter(Budget.month == month)
+        query = query.where(Budget.month == month)
     if category:
-        query = query.filter(Budget.category == category)
-    return query.all()
+        query = query.where(Budget.category == category)
+    return BUDGET_ROWS.response((await db.execute(query)).all())
 
 @router.post("/", response_model=BudgetRead)
 def create_budget(
@@ -1,77 +1,125 @@
 # backend/app/routers/categories.py
 
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models import CategoryOverride, Transaction
 from ..schemas import (
     CategoryOverrideRead,
     CategoryOverrideBase,
+    CategoryOverrideWrite,
     TransactionRead
 )
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_async_db, get_current_user, get_optional_user
+from .. import overrides
+from ..serialization import RowSerializer
+from ..queries import transaction_criteria, paginate, InvalidCursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
+TX_ROWS = RowSerializer(TransactionRead, Transaction)
+
 # --- Overrides existing endpoints ---
 @router.get("/overrides", response_model=List[CategoryOverrideRead])
-def get_overrides(db: Session = Depends(get_db)):
-    return db.query(CategoryOverride).all()
+async def get_overrides(db: AsyncSession = Depends(get_async_db)):
+    return (await db.execute(select(CategoryOverride))).scalars().all()
+
+def _require_user(current_user) -> None:
+    # Overrides are global, but history is only rewritten for the caller
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Sign in to recategorize existing transactions",
+                            headers={"WWW-Authenticate": "Bearer"})
 
-@router.post("/overrides", response_model=CategoryOverrideRead)
-def create_override(data: CategoryOverrideBase, db: Session = Depends(get_db)):
+def _override_write(ov: CategoryOverride, result: Optional[dict]) -> dict:
+    return {"id": ov.id, "keyword": ov.keyword, "category": ov.category, "recategorized": result}
+
+@router.post("/overrides", response_model=CategoryOverrideWrite)
+def create_override(data: CategoryOverrideBase, recategorize: bool = False,
+                    db: Session = Depends(get_db), current_user=Depends(get_optional_user)):
+    """
+    With `recategorize=true` the caller's existing transactions are
+    re-categorized against the new rule too (see overrides.recategorize).
+    """
+    if recategorize:
+        _require_user(current_user)
     ov = CategoryOverride(keyword=data.keyword, category=data.category)
     db.add(ov)
     db.commit()
     db.refresh(ov)
-    return ov
+    result = overrides.recategorize(db, current_user.id, [ov.keyword]) if recategorize else None
+    return _override_write(ov, result)
 
-@router.put("/overrides/{ov_id}", response_model=CategoryOverrideRead)
-def update_override(ov_id: int, data: CategoryOverrideBase, db: Session = Depends(get_db)):
+@router.put("/overrides/{ov_id}", response_model=CategoryOverrideWrite)
+def update_override(ov_id: int, data: CategoryOverrideBase, recategorize: bool = False,
+                    db: Session = Depends(get_db), current_user=Depends(get_optional_user)):
+    if recategorize:
+        _require_user(current_user)
     ov = db.query(CategoryOverride).filter(CategoryOverride.id == ov_id).first()
     if not ov:
         raise HTTPException(status_code=404, detail="Override not found")
+    old_keyword, old_category = ov.keyword, ov.category
     ov.keyword = data.keyword
     ov.category = data.category
     db.commit()
     db.refresh(ov)
-    return ov
+    result = overrides.recategorize(db, current_user.id, [old_keyword, ov.keyword], old_category) \
+        if recategorize else None
+    return _override_write(ov, result)
 
 @router.delete("/overrides/{ov_id}", status_code=204)
-def delete_override(ov_id: int, db: Session = Depends(get_db)):
+def delete_override(ov_id: int, recategorize: bool = False,
+                    db: Session = Depends(get_db), current_user=Depends(get_optional_user)):
+    """
+    204 as before; with `recategorize=true` responds 200 with the
+    recategorization counts instead.
+    """
+    if recategorize:
+        _require_user(current_user)
     ov = db.query(CategoryOverride).filter(CategoryOverride.id == ov_id).first()
     if not ov:
         raise HTTPException(status_code=404, detail="Override not found")
+    keyword, category = ov.keyword, ov.category
     db.delete(ov)
     db.commit()
+    if recategorize:
+        return JSONResponse(overrides.recategorize(db, current_user.id, [keyword], category))
     return
 
 # --- List all categories (names only) ---
 @router.get("/", response_model=List[str])
-def list_categories(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+async def list_categories(db: AsyncSession = Depends(get_async_db), current_user = Depends(get_current_user)):
     # Example: return distinct category names from this user's transactions
-    cats = (
-        db.query(Transaction.category)
-          .filter(Transaction.user_id == current_user.id)
+    cats = await db.execute(
+        select(Transaction.category)
+          .where(Transaction.user_id == current_user.id)
           .distinct()
-          .all()
     )
-    return [c[0] for c in cats]
+    return cats.scalars().all()
 
 # --- New: Get all transactions for a given category ---
 @router.get("/{category_name}/transactions", response_model=List[TransactionRead])
-def get_transactions_by_category(
+async def get_transactions_by_category(
     category_name: str,
-    db: Session = Depends(get_db),
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    account_id: Optional[int] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user)
 ):
-    txs = (
-        db.query(Transaction)
-          .filter(
-              Transaction.user_id   == current_user.id,
-              Transaction.category  == category_name
-          )
-          .all()
-    )
-    return txs
\ No newline at end of file
+    # Same paging and filters as GET /transactions, pinned to one category
+    q = select(*TX_ROWS.columns).where(*transaction_criteria(
+        current_user.id, start, end, account_id, category_name, min_amount, max_amount))
+    try:
+        rows, next_cursor = await paginate(db, q, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TX_ROWS.response(rows, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
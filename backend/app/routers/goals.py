@@ -1,19 +1,25 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..schemas import GoalCreate, GoalRead, GoalUpdate, GoalFunds
 from ..models import Goal
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_async_db, get_current_user
+from ..serialization import RowSerializer
 
 router = APIRouter(prefix="/goals", tags=["Goals"])
 
+GOAL_ROWS = RowSerializer(GoalRead, Goal)
+
 @router.get("", response_model=List[GoalRead])
-def list_goals(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return db.query(Goal).filter(Goal.user_id == current_user.id).all()
+async def list_goals(db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    rows = (await db.execute(select(*GOAL_ROWS.columns).where(Goal.user_id == current_user.id))).all()
+    return GOAL_ROWS.response(rows)
 
 @router.get("/{goal_id}", response_model=GoalRead)
-def get_goal(goal_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    g = db.query(Goal).filter(Goal.id == goal_id, Goal.user_id == current_user.id).first()
+async def get_goal(goal_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    g = (await db.execute(select(Goal).where(Goal.id == goal_id, Goal.user_id == current_user.id))).scalar()
     if not g:
         raise HTTPException(status_code=404, detail="Goal not found")
     return g
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends
+
+from ..user_cache import user_cache
+from .. import passwords
+from ..dependencies import get_current_user
+
+# Operational stats are for signed-in callers only
+router = APIRouter(prefix="/metrics", tags=["Metrics"], dependencies=[Depends(get_current_user)])
+
+@router.get("/categorize", response_model=dict)
+def categorize_metrics():
+    from ..categorize import category_cache
+    return category_cache.stats()
+
+@router.get("/auth", response_model=dict)
+def auth_metrics():
+    return user_cache.stats()
+
+@router.get("/passwords", response_model=dict)
+def password_metrics():
+    return passwords.stats()
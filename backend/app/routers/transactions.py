@@ -1,40 +1,200 @@
-from typing import List, Dict
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+import datetime
+from typing import List, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
-from ..schemas import TransactionCreate, TransactionRead, TransactionUpdate
-from ..models import Transaction
-from ..dependencies import get_db, get_current_user
-from ..categorize import import_transactions
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..schemas import (TransactionCreate, TransactionRead, TransactionUpdate, ImportJobRead,
+                       TransactionSelection, TransactionBatchUpdate)
+from ..models import Account, Transaction, ImportJob
+from ..dependencies import get_db, get_read_db, get_async_db, get_current_user
+from ..profiles import ProfileStore
+from ..jobs import submit_import, JobLimitExceeded
+from ..rollups import apply_deltas, deltas_for_transactions, deltas_for_query, deltas_from_rows
+from ..queries import (transaction_criteria, paginate, InvalidCursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE,
+                       BATCH_MUTATION_LIMIT)
+from ..serialization import RowSerializer
+from ..export import (ExportFormat, ExportUnavailable, MEDIA_TYPES, SELF_COMPRESSED, accepts_gzip,
+                      check_available, export_chunks)
 
 router = APIRouter()
 
+TX_ROWS = RowSerializer(TransactionRead, Transaction)
+
 @router.post("/transactions/upload", response_model=Dict[str, int])
-def upload_transactions(file: UploadFile = File(...), db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    contents = file.file.read()
-    df = import_transactions(contents, file.filename)
-    inserted = 0
-    for _, row in df.iterrows():
-        tr = Transaction(
-            date=row["Date"],
-            description=row["Description"],
-            amount=row["Amount"],
-            category=row["Category"],
-            user_id=current_user.id,
-            account_id=row.get("SourceID") or None
-        )
-        db.add(tr); inserted += 1
-    db.commit()
-    return {"inserted": inserted}
+def upload_transactions(
+    file: UploadFile = File(...),
+    stream: bool = False,
+    background: bool = False,
+    dayfirst: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user)
+):
+    # The parsing/categorization stack (pandas, rapidfuzz, the model) is
+    # loaded on the first upload rather than at app import
+    from ..categorize import import_transactions, iter_import_transactions, AmbiguousDateFormat
+    from ..bulk import bulk_insert_transactions
+
+    if background:
+        # Hand the file to the import worker pool and return straight away
+        try:
+            job = submit_import(db, current_user.id, file.file, file.filename, dayfirst)
+        except JobLimitExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e))
+        return {"job_id": job.id}
+
+    try:
+        if stream:
+            # Parse, categorize and persist chunk by chunk straight off the
+            # spooled upload, so memory stays flat regardless of file size
+            inserted, skipped, rejected, seconds = 0, 0, 0, 0.0
+            occurrences = {}
+            for chunk in iter_import_transactions(file.file, file.filename, dayfirst=dayfirst,
+                                                  profiles=ProfileStore(db)):
+                result = bulk_insert_transactions(db, chunk, current_user.id, occurrences=occurrences)
+                inserted += result["inserted"]
+                skipped += result["skipped"]
+                rejected += result["rejected"]
+                seconds += result["seconds"]
+            rate = (inserted + skipped) / seconds if seconds else 0.0
+            return {"inserted": inserted, "skipped": skipped, "rejected": rejected, "rows_per_sec": int(rate)}
+
+        contents = file.file.read()
+        df = import_transactions(contents, file.filename, dayfirst=dayfirst,
+                                 profiles=ProfileStore(db))
+    except AmbiguousDateFormat as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = bulk_insert_transactions(db, df, current_user.id)
+    return {"inserted": result["inserted"], "skipped": result["skipped"], "rejected": result["rejected"],
+            "rows_per_sec": int(result["rows_per_sec"])}
+
+@router.get("/transactions/imports/{job_id}", response_model=ImportJobRead)
+async def get_import_job(job_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    job = (await db.execute(
+        select(ImportJob).where(ImportJob.id == job_id, ImportJob.user_id == current_user.id))).scalar()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 @router.get("/transactions", response_model=List[TransactionRead])
-def list_transactions(start: str = None, end: str = None, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    q = db.query(Transaction).filter(Transaction.user_id == current_user.id)
-    # optional date filtering omitted for brevity
-    return q.all()
+async def list_transactions(
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    account_id: Optional[int] = None,
+    category: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    One page of transactions, newest first. Date bounds are inclusive;
+    pass the X-Next-Cursor header of a response back as `cursor` to get
+    the following page.
+    """
+    q = select(*TX_ROWS.columns).where(*transaction_criteria(
+        current_user.id, start, end, account_id, category, min_amount, max_amount))
+    try:
+        rows, next_cursor = await paginate(db, q, limit, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return TX_ROWS.response(rows, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+def _selection_criteria(db: Session, sel: TransactionSelection, user_id: int) -> list:
+    """
+    WHERE criteria for a batch mutation, after checking it is bounded.
+    """
+    if sel.ids is None and sel.filter is None:
+        raise HTTPException(status_code=400, detail="Pass `ids`, `filter` or both")
+    f = sel.filter.dict() if sel.filter else {}
+    if not sel.ids and all(v is None for v in f.values()):
+        # An empty filter would select the whole history
+        raise HTTPException(status_code=400, detail="Selection is empty: pass `ids` or a filter criterion")
+    criteria = transaction_criteria(user_id, **f)
+    if sel.ids is not None:
+        if len(sel.ids) > BATCH_MUTATION_LIMIT:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_MUTATION_LIMIT} ids per request")
+        criteria.append(Transaction.id.in_(sel.ids))
+    matched = db.scalar(select(func.count()).select_from(Transaction).where(*criteria))
+    if matched > BATCH_MUTATION_LIMIT:
+        raise HTTPException(status_code=400, detail=f"Selection matches {matched} transactions; "
+                                                    f"at most {BATCH_MUTATION_LIMIT} per request")
+    return criteria
+
+@router.patch("/transactions", response_model=Dict[str, int])
+def update_transactions(data: TransactionBatchUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """
+    Set category and/or account on every selected transaction with one
+    UPDATE, rollups adjusted in the same transaction.
+    """
+    values = {k: v for k, v in (("category", data.category), ("account_id", data.account_id)) if v is not None}
+    if not values:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    if data.account_id is not None and not db.scalar(
+            select(Account.id).where(Account.id == data.account_id, Account.user_id == current_user.id)):
+        raise HTTPException(status_code=403, detail="Account not found for this user")
+    criteria = _selection_criteria(db, data, current_user.id)
+    t = Transaction
+    apply_deltas(db, deltas_for_query(db, *criteria, sign=-1))
+    rows = db.execute(update(t).where(*criteria).values(**values)
+                      .returning(t.user_id, t.account_id, t.date, t.amount, t.category)
+                      .execution_options(synchronize_session=False)).all()
+    apply_deltas(db, deltas_from_rows([r._asdict() for r in rows]))
+    db.commit()
+    return {"updated": len(rows)}
+
+@router.delete("/transactions", response_model=Dict[str, int])
+def delete_transactions(sel: TransactionSelection, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+    """
+    Delete every selected transaction with one DELETE, rollups adjusted in
+    the same transaction.
+    """
+    criteria = _selection_criteria(db, sel, current_user.id)
+    apply_deltas(db, deltas_for_query(db, *criteria, sign=-1))
+    result = db.execute(delete(Transaction).where(*criteria).execution_options(synchronize_session=False))
+    db.commit()
+    return {"deleted": result.rowcount}
+
+@router.get("/transactions/export")
+def export_transactions(
+    request: Request,
+    fmt: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    gzip: bool = True,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    account_id: Optional[int] = None,
+    category: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_user)
+):
+    """
+    Stream the user's full (filtered) history, oldest first, as NDJSON,
+    CSV, Parquet or an Arrow IPC stream. Text formats are gzipped on the
+    fly when the client's Accept-Encoding allows it, unless `gzip=false`.
+    """
+    try:
+        check_available(fmt.value)
+    except ExportUnavailable as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    criteria = transaction_criteria(current_user.id, start, end, account_id, category, min_amount, max_amount)
+    headers = {"Content-Disposition": f'attachment; filename="transactions.{fmt.value}"'}
+    if fmt.value not in SELF_COMPRESSED:
+        headers["Vary"] = "Accept-Encoding"
+        gzip = gzip and accepts_gzip(request.headers.get("accept-encoding"))
+        if gzip:
+            headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(export_chunks(db, criteria, fmt.value, gzip=gzip),
+                             media_type=MEDIA_TYPES[fmt.value], headers=headers)
 
 @router.get("/transactions/{tx_id}", response_model=TransactionRead)
-def get_transaction(tx_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    tr = db.query(Transaction).filter(Transaction.id == tx_id, Transaction.user_id == current_user.id).first()
+async def get_transaction(tx_id: int, db: AsyncSession = Depends(get_async_db), current_user=Depends(get_current_user)):
+    tr = (await db.execute(
+        select(Transaction).where(Transaction.id == tx_id, Transaction.user_id == current_user.id))).scalar()
     if not tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
     return tr
@@ -44,7 +204,10 @@ def update_transaction(tx_id: int, data: TransactionUpdate, db: Session = Depend
     tr = db.query(Transaction).filter(Transaction.id == tx_id, Transaction.user_id == current_user.id).first()
     if not tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
-    tr.category = data.category
+    if tr.category != data.category:
+        apply_deltas(db, deltas_for_transactions([tr], sign=-1))
+        tr.category = data.category
+        apply_deltas(db, deltas_for_transactions([tr]))
     db.commit(); db.refresh(tr)
     return tr
 
@@ -53,5 +216,6 @@ def delete_transaction(tx_id: int, db: Session = Depends(get_db), current_user=D
     tr = db.query(Transaction).filter(Transaction.id == tx_id, Transaction.user_id == current_user.id).first()
     if not tr:
         raise HTTPException(status_code=404, detail="Transaction not found")
+    apply_deltas(db, deltas_for_transactions([tr], sign=-1))
     db.delete(tr); db.commit()
     return {"msg": "deleted"}
\ No newline at end of file
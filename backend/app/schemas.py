@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict
-from datetime import date
+from datetime import date, datetime
 
 # User schemas
 class UserBase(BaseModel):
@@ -47,6 +47,26 @@ class TransactionCreate(TransactionBase):
 class TransactionUpdate(BaseModel):
     category: str
 
+class TransactionFilter(BaseModel):
+    start: Optional[date] = None
+    end: Optional[date] = None
+    account_id: Optional[int] = None
+    category: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    description: Optional[str] = None
+
+class TransactionSelection(BaseModel):
+    """
+    Rows for a batch mutation: explicit ids, a filter, or both (ANDed).
+    """
+    ids: Optional[List[int]] = None
+    filter: Optional[TransactionFilter] = None
+
+class TransactionBatchUpdate(TransactionSelection):
+    category: Optional[str] = None
+    account_id: Optional[int] = None
+
 class TransactionRead(TransactionBase):
     id: int
     user_id: int
@@ -55,6 +75,24 @@ class TransactionRead(TransactionBase):
     class Config:
         orm_mode = True
 
+# Import job schemas
+class ImportJobRead(BaseModel):
+    id: int
+    filename: str
+    state: str
+    rows_processed: int
+    rows_rejected: int
+    inserted: int
+    skipped: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
 # Category override schemas
 class CategoryOverrideBase(BaseModel):
     keyword: str
@@ -69,6 +107,13 @@ class CategoryOverrideRead(CategoryOverrideBase):
     class Config:
         orm_mode = True
 
+class RecategorizeResult(BaseModel):
+    changed: int
+    seconds: float
+
+class CategoryOverrideWrite(CategoryOverrideRead):
+    recategorized: Optional[RecategorizeResult] = None
+
 # Goal schemas
 class GoalBase(BaseModel):
     name: str
@@ -131,4 +176,5 @@ class SummaryReport(BaseModel):
     totalExpense: float
 
 class TrendsReport(BaseModel):
-    trends: Dict[str, Dict[str, float]]
\ No newline at end of file
+    trends: Dict[str, Dict[str, float]]
+    byCategory: Optional[Dict[str, Dict[str, float]]] = None
\ No newline at end of file
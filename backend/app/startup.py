@@ -0,0 +1,111 @@
+"""
+Worker startup: optional warm-up of the categorization stack, and a
+benchmark of cold import time.
+
+The import/categorization stack (pandas, rapidfuzz, joblib, the model
+files and the compiled overrides) loads on first use, so a worker that
+never sees an upload never pays for it. Set WARMUP_ON_STARTUP=1 to load
+it in the lifespan instead, before the worker takes traffic.
+
+    python -m app.startup bench [--runs 5] [--warm-up]
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ON_STARTUP = bool(int(os.getenv("WARMUP_ON_STARTUP", 0)))
+
+# Modules whose presence after `import app.main` means something heavy
+# was imported eagerly
+HEAVY_MODULES = ("pandas", "numpy", "rapidfuzz", "joblib", "sklearn")
+
+def warm_up() -> dict:
+    """
+    Import the categorization stack and load the model and overrides,
+    returning seconds spent per step.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    from . import categorize
+    timings["import"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    categorize.refresh_model()
+    timings["model"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    categorize.override_matcher()
+    timings["overrides"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    categorize.categorize_batch(["warm up"])
+    timings["first_batch"] = time.perf_counter() - t0
+    logger.info("warm-up: %s", ", ".join(f"{k} {v:.3f}s" for k, v in timings.items()))
+    return timings
+
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import app.main
+imported = time.perf_counter() - t0
+heavy = [m for m in %(heavy)r if m in sys.modules]
+warm = {}
+if %(warm)r:
+    from app.migrations import upgrade
+    from app.db import engine
+    upgrade(engine)
+    from app.startup import warm_up
+    warm = warm_up()
+print(json.dumps({"import": imported, "warm_up": sum(warm.values()), "heavy": heavy}))
+"""
+
+def benchmark(runs: int = 5, warm: bool = False) -> dict:
+    """
+    Time `import app.main` in `runs` fresh interpreters (what every worker
+    pays on start), optionally followed by the warm-up.
+    """
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _PROBE % {"warm": warm, "heavy": HEAVY_MODULES}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # The warm-up run migrates a database; keep it away from the real one
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/startup-bench.db"}
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", code], cwd=backend, env=env, check=True,
+                                 capture_output=True, text=True).stdout
+            results.append(json.loads(out.strip().splitlines()[-1]))
+    imports = [r["import"] for r in results]
+    return {
+        "runs": runs,
+        "import_median": statistics.median(imports),
+        "import_min": min(imports),
+        "warm_up_median": statistics.median(r["warm_up"] for r in results) if warm else None,
+        "heavy_modules": results[-1]["heavy"],
+    }
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.startup")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    bench = sub.add_parser("bench", help="time cold `import app.main` in fresh processes")
+    bench.add_argument("--runs", type=int, default=5)
+    bench.add_argument("--warm-up", action="store_true", help="also time the warm-up hook")
+    args = parser.parse_args(argv)
+
+    r = benchmark(args.runs, args.warm_up)
+    print(f"import app.main: median {r['import_median'] * 1000:.0f} ms, "
+          f"min {r['import_min'] * 1000:.0f} ms over {r['runs']} runs")
+    if r["warm_up_median"] is not None:
+        print(f"warm-up: median {r['warm_up_median'] * 1000:.0f} ms")
+    print("heavy modules loaded at import: " + (", ".join(r["heavy_modules"]) or "none"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
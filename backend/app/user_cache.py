@@ -0,0 +1,102 @@
+"""
+In-process cache of verified bearer tokens -> CurrentUser, so the
+per-request auth dependency skips JWT verification and the user lookup
+for tokens it has already seen. Entries expire after USER_CACHE_TTL
+seconds (never past the token's own expiry) and are dropped as soon as
+their User row changes in this process; other processes see the change
+within the TTL, when the next miss reloads the user.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+
+from .models import User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    What request handlers need to know about the caller.
+    """
+    id: int
+    email: str
+    name: Optional[str] = None
+
+class UserCache:
+    """
+    Bounded LRU map of bearer token -> CurrentUser with a per-entry TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize   = maxsize
+        self.ttl       = ttl
+        self.hits      = 0
+        self.misses    = 0
+        self.expired   = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[CurrentUser]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires = entry
+            if expires <= now:
+                del self._data[subject]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(subject)
+            self.hits += 1
+            return user
+
+    def put(self, subject: str, user: CurrentUser, ttl: float = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[subject] = (user, time.monotonic() + ttl)
+            self._data.move_to_end(subject)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            for subject in [s for s, (u, _) in self._data.items() if u.id == user_id]:
+                del self._data[subject]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size":      len(self._data),
+            "maxsize":   self.maxsize,
+            "ttl":       self.ttl,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "expired":   self.expired,
+            "evictions": self.evictions,
+            "hit_rate":  self.hits / lookups if lookups else 0.0,
+        }
+
+user_cache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
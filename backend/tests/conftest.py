@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.db
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+# No model or overrides.json: categories come from the rules alone
+os.environ.setdefault("MODEL_DIR", tempfile.mkdtemp())
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
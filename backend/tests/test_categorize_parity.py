@@ -0,0 +1,57 @@
+"""
+`categorize_batch` must give exactly what `choose_category` gives row by
+row: override (exact, then keyword), MCC, keyword at FUZZY_THRESHOLD with
+ties to the first keyword, ML, 'Other'.
+"""
+import pytest
+from sqlalchemy import delete
+
+from app import overrides
+from app.categorize import categorize_batch, category_cache, choose_category
+from app.db import SessionLocal, engine
+from app.migrations import upgrade
+from app.models import CategoryOverride
+
+ROWS = [
+    ("Carrefour City Centre", None),       # keyword
+    ("  UBER   Trip ", None),              # case and whitespace
+    ("uber trip", "5411"),                 # MCC beats keyword
+    ("Coffee Beans", "9999"),              # unknown MCC is ignored
+    ("gas station cafe", None),            # tie: first keyword in map order
+    ("ubr", None),                         # tie just above the threshold
+    ("ktchn", None),                       # just below it
+    ("qzxv 1234", None),                   # nothing matches: 'Other'
+    ("", None),
+    ("Spotify Family", "5812"),            # keyword override beats MCC
+    ("spotify family", None),
+    ("Rent to My Landlord", "5411"),       # exact override beats everything
+    ("rent to my landlord extra", None),   # exact only means exact
+    ("Carrefour City Centre", None),       # repeats
+]
+
+@pytest.fixture
+def rules():
+    upgrade(engine)
+    with SessionLocal() as db:
+        db.add(CategoryOverride(keyword="spotify", category="Music"))
+        db.commit()
+        overrides.set_exact_overrides({"rent to my landlord": "Housing"})
+        yield
+        db.execute(delete(CategoryOverride))
+        db.commit()
+        overrides.set_exact_overrides({})
+
+def test_batch_matches_per_row(rules):
+    descs, mccs = zip(*ROWS)
+    category_cache.clear()
+    batch = categorize_batch(list(descs), list(mccs)).tolist()
+    category_cache.clear()
+    per_row = [choose_category(d, m) for d, m in ROWS]
+    assert batch == per_row
+    assert per_row[2] == "Groceries" and per_row[9] == "Music" and per_row[11] == "Housing"
+    assert per_row[6] == per_row[7] == "Other"
+
+def test_batch_without_mccs(rules):
+    descs = [d for d, _ in ROWS]
+    category_cache.clear()
+    assert categorize_batch(descs).tolist() == [choose_category(d) for d in descs]
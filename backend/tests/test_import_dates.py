@@ -0,0 +1,46 @@
+"""
+Date handling on import: a format remembered for a bank layout is only
+reused when this file's dates fit it, and cells the format rejects are
+read in its day/month order.
+"""
+import datetime
+
+import pandas as pd
+import pytest
+
+from app.categorize import AmbiguousDateFormat, header_fingerprint, import_transactions, parse_dates
+from app.db import SessionLocal, engine
+from app.migrations import upgrade
+from app.profiles import ProfileStore
+
+HEADER = ["Date", "Details", "Amount"]
+
+def _csv(*dates) -> bytes:
+    return "\n".join([",".join(HEADER)] + [f"{d},Coffee,-3.50" for d in dates]).encode()
+
+@pytest.fixture
+def profiles():
+    upgrade(engine)
+    with SessionLocal() as db:
+        yield ProfileStore(db)
+
+def test_cached_date_format_is_rechecked(profiles):
+    import_transactions(_csv("2024-03-05", "2024-03-17"), "iso.csv", profiles=profiles)
+    fp = header_fingerprint(HEADER)
+    assert profiles.find([fp])[fp]["date_format"] == "%Y-%m-%d"
+
+    # Same layout, slashed dates: the cached ISO format must not be trusted
+    with pytest.raises(AmbiguousDateFormat):
+        import_transactions(_csv("05/03/2024"), "slashed.csv", profiles=profiles)
+
+    df = import_transactions(_csv("05/03/2024"), "slashed.csv", dayfirst=True, profiles=profiles)
+    assert df["Date"].dt.date.tolist() == [datetime.date(2024, 3, 5)]
+    assert profiles.find([fp])[fp]["date_format"] == "%d/%m/%Y"
+
+def test_residual_cells_follow_the_inferred_order():
+    # " 05/03/2024" only differs by whitespace; "05.03.2024 10:00" fits no
+    # DATE_FORMATS entry and goes to dateutil, which must read it day-first too
+    parsed = parse_dates(pd.Series(["13/03/2024", " 05/03/2024", "05.03.2024 10:00"]))
+    assert parsed.attrs["date_format"] == "%d/%m/%Y"
+    assert parsed.dt.date.tolist() == [datetime.date(2024, 3, 13), datetime.date(2024, 3, 5),
+                                       datetime.date(2024, 3, 5)]
@@ -0,0 +1,59 @@
+"""
+Stale import jobs are judged by their heartbeat, not their age, and a
+worker never overwrites a job that was failed under it.
+"""
+import datetime
+
+import pytest
+from sqlalchemy import delete
+
+from app import jobs
+from app.db import SessionLocal, engine
+from app.migrations import upgrade
+from app.models import ImportJob
+
+NOW = datetime.datetime.utcnow()
+HOURS_AGO = lambda h: NOW - datetime.timedelta(hours=h)
+
+@pytest.fixture
+def db():
+    upgrade(engine)
+    with SessionLocal() as s:
+        s.execute(delete(ImportJob))
+        s.commit()
+        yield s
+
+def _job(db, state, created, updated=None) -> ImportJob:
+    job = ImportJob(user_id=1, filename="x.csv", state=state, created_at=created,
+                    started_at=created if state == "running" else None, updated_at=updated or created)
+    db.add(job)
+    db.commit()
+    return job
+
+def _states(db, *js) -> list:
+    db.expire_all()
+    return [db.get(ImportJob, j.id).state for j in js]
+
+def test_long_running_job_with_a_heartbeat_is_kept(db):
+    alive = _job(db, "running", HOURS_AGO(3), updated=NOW)
+    lost = _job(db, "running", HOURS_AGO(3), updated=HOURS_AGO(2))
+    assert jobs.fail_stale_jobs(db) == 1
+    assert _states(db, alive, lost) == ["running", "failed"]
+
+def test_queue_behind_progressing_imports_is_kept(db):
+    _job(db, "running", HOURS_AGO(3), updated=NOW)
+    waiting = _job(db, "queued", HOURS_AGO(2))
+    assert jobs.fail_stale_jobs(db) == 0
+
+    db.execute(delete(ImportJob).where(ImportJob.state == "running"))
+    db.commit()
+    assert jobs.fail_stale_jobs(db) == 1
+    assert _states(db, waiting) == ["failed"]
+
+def test_worker_leaves_a_failed_job_alone(db, tmp_path):
+    path = tmp_path / "x.csv"
+    path.write_text("Date,Description,Amount,SourceID\n2024-03-05,Coffee,-3,1\n")
+    job = _job(db, "failed", NOW)
+    jobs.run_import_job(job.id, 1, str(path), "x.csv")
+    db.expire_all()
+    assert (db.get(ImportJob, job.id).state, db.get(ImportJob, job.id).inserted) == ("failed", 0)
@@ -0,0 +1,56 @@
+"""
+Hot-swapping the model: one load per version however many threads ask,
+and a pointer to a missing version keeps the previous model.
+"""
+import threading
+
+import pytest
+
+from app import artifacts, categorize
+
+class Vectorizer:
+    def transform(self, descs):
+        return list(descs)
+
+class Classifier:
+    """Labels every description with one category."""
+    def __init__(self, category: str):
+        self.category = category
+
+    def predict(self, X):
+        return [self.category] * len(X)
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_POINTER_FILE", str(tmp_path / "CURRENT"))
+    monkeypatch.setattr(artifacts, "VERSIONS_DIR", str(tmp_path / "versions"))
+    monkeypatch.setattr(categorize, "_model", (None, None))
+    monkeypatch.setattr(categorize, "_model_stamp", None)
+    monkeypatch.setattr(categorize, "_failed_stamp", None)
+    return tmp_path
+
+def _publish(version: str, category: str = "Transport") -> None:
+    artifacts.publish(Classifier(category), Vectorizer(), version)
+
+def test_concurrent_refresh_loads_once(model_dir, monkeypatch):
+    _publish("v1")
+    calls = []
+    real_load = artifacts.load
+    monkeypatch.setattr(artifacts, "load", lambda stamp: calls.append(stamp) or real_load(stamp))
+
+    threads = [threading.Thread(target=categorize.refresh_model) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == [("version", "v1")]
+    assert categorize.predict_categories(["uber ride"]) == ["Transport"]
+
+def test_missing_version_keeps_previous_model(model_dir):
+    _publish("v1")
+    assert categorize.refresh_model() == ("version", "v1")
+    (model_dir / "CURRENT").write_text("gone\n")
+
+    assert categorize.refresh_model() == ("version", "v1")
+    assert categorize._model[0] is not None
+    assert categorize.predict_categories(["coffee shop"]) == ["Transport"]
@@ -0,0 +1,63 @@
+"""
+Every hot router query must be answered from an index. Statements are
+built with the same helpers the routers use, so a change to a filter or
+an index shows up here.
+"""
+import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.db import engine
+from app.migrations import upgrade
+from app.models import Transaction, Budget, Goal
+from app.queries import transaction_criteria, page_query, encode_cursor
+from app.routers.analysis import summary_query, trends_queries
+from app.routers.transactions import TX_ROWS
+
+UID = 1
+FIRST, LAST = datetime.date(2024, 1, 1), datetime.date(2024, 3, 31)
+
+def _tx_page(**filters):
+    return page_query(select(*TX_ROWS.columns).where(*transaction_criteria(UID, **filters)), 100)
+
+QUERIES = {
+    "list_transactions": lambda: _tx_page(),
+    "list_transactions_range": lambda: _tx_page(start=FIRST, end=LAST),
+    "list_transactions_account": lambda: _tx_page(account_id=1),
+    "list_transactions_amount": lambda: _tx_page(start=FIRST, min_amount=-100, max_amount=100),
+    "list_transactions_cursor": lambda: page_query(
+        select(*TX_ROWS.columns).where(*transaction_criteria(UID)), 100,
+        encode_cursor(Transaction(date=LAST, id=1000))),
+    "transactions_by_category": lambda: _tx_page(category="Groceries"),
+    "summary_month": lambda: summary_query(UID, month="2024-01"),
+    "summary_month_account": lambda: summary_query(UID, month="2024-01", account_id=1),
+    "summary_range": lambda: summary_query(UID, start="2024-01-10", end="2024-03-20"),
+    "summary_range_account": lambda: summary_query(UID, start="2024-01-10", end="2024-03-20", account_id=1),
+    "trends_day": lambda: trends_queries(UID, "day", "2024-01-01", "2024-01-31")[0],
+    "trends_week": lambda: trends_queries(UID, "week", "2024-01-01")[0],
+    "trends_month": lambda: trends_queries(UID, "month", "2024-01-01", "2024-03-31")[0],
+    "trends_quarter_by_category": lambda: trends_queries(UID, "quarter")[1],
+    "trends_day_by_category": lambda: trends_queries(UID, "day", "2024-01-01")[1],
+    "list_categories": lambda: select(Transaction.category).where(Transaction.user_id == UID).distinct(),
+    "list_budgets": lambda: select(Budget).where(Budget.user_id == UID, Budget.year == 2024, Budget.month == 1),
+    "list_goals": lambda: select(Goal).where(Goal.user_id == UID),
+}
+
+@pytest.fixture(scope="module")
+def conn():
+    upgrade(engine)
+    with engine.connect() as c:
+        yield c
+
+def _plan(conn, stmt) -> list[str]:
+    sql = str(stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    return [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_query_uses_index(conn, name):
+    plan = _plan(conn, QUERIES[name]())
+    lookups = [line for line in plan if line.startswith(("SEARCH ", "SCAN "))]
+    assert lookups, plan
+    for line in lookups:
+        assert "USING INDEX" in line or "USING COVERING INDEX" in line, f"{name}: {plan}"
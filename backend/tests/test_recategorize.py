@@ -0,0 +1,87 @@
+"""
+Removing or re-keying an override with recategorize must give its rows
+back to the other rules, including rows imported while the rule existed
+(whose `original_cat` is the rule's own category).
+"""
+import pytest
+from sqlalchemy import delete, select
+
+from app import overrides
+from app.bulk import bulk_insert_transactions
+from app.categorize import choose_category, import_transactions
+from app.db import SessionLocal, engine
+from app.migrations import upgrade
+from app.models import CategoryOverride, Transaction
+
+UID = 7
+
+CSV = b"""Date,Description,Amount
+2024-03-01,Uber trip,-12.50
+2024-03-02,Lyft ride,-9.00
+2024-03-03,Uber trip,-14.00
+"""
+
+@pytest.fixture
+def db():
+    upgrade(engine)
+    with SessionLocal() as s:
+        yield s
+        s.execute(delete(Transaction).where(Transaction.user_id == UID))
+        s.execute(delete(CategoryOverride))
+        s.commit()
+
+def _add_rule(db, keyword, category) -> CategoryOverride:
+    ov = CategoryOverride(keyword=keyword, category=category)
+    db.add(ov)
+    db.commit()
+    return ov
+
+def _import(db) -> None:
+    df = import_transactions(CSV, "statement.csv")
+    df["SourceID"] = 1
+    bulk_insert_transactions(db, df, UID)
+
+def _categories(db) -> dict:
+    rows = db.execute(select(Transaction.description, Transaction.category)
+                      .where(Transaction.user_id == UID)).all()
+    return {desc: cat for desc, cat in rows}
+
+def test_delete_reverts_rows_imported_under_the_rule(db):
+    ov = _add_rule(db, "uber", "Rideshare")
+    _import(db)
+    assert _categories(db)["Uber trip"] == "Rideshare"
+
+    db.delete(ov)
+    db.commit()
+    result = overrides.recategorize(db, UID, ["uber"], "Rideshare")
+
+    assert result["changed"] == 2
+    assert _categories(db)["Uber trip"] == choose_category("Uber trip") == "Transport"
+
+def test_rekey_moves_rows_between_descriptions(db):
+    ov = _add_rule(db, "uber", "Rideshare")
+    _import(db)
+    assert _categories(db) == {"Uber trip": "Rideshare", "Lyft ride": "Other"}
+
+    ov.keyword = "lyft"
+    db.commit()
+    result = overrides.recategorize(db, UID, ["uber", "lyft"], "Rideshare")
+
+    assert result["changed"] == 3
+    assert _categories(db) == {"Uber trip": "Transport", "Lyft ride": "Rideshare"}
+
+def test_manual_edit_survives_delete(db):
+    ov = _add_rule(db, "uber", "Rideshare")
+    _import(db)
+    edited = db.scalars(select(Transaction).where(Transaction.user_id == UID,
+                                                  Transaction.description == "Uber trip")).first()
+    edited.category = "Business"
+    db.commit()
+
+    db.delete(ov)
+    db.commit()
+    overrides.recategorize(db, UID, ["uber"], "Rideshare")
+
+    cats = db.scalars(select(Transaction.category).where(Transaction.user_id == UID,
+                                                         Transaction.description == "Uber trip")).all()
+    assert sorted(cats) == ["Business", "Transport"]
@@ -14,6 +14,22 @@ client.interceptors.request.use(cfg => {
   return cfg;
 });
 
+// Listings come back a page at a time; the next page's cursor is in the
+// X-Next-Cursor header (absent on the last page)
+const PAGE_SIZE = 1000;
+
+async function getAllPages(url, params = {}) {
+  const rows = [];
+  let cursor;
+  let res;
+  do {
+    res = await client.get(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+    rows.push(...res.data);
+    cursor = res.headers['x-next-cursor'];
+  } while (cursor);
+  return { ...res, data: rows };
+}
+
 // Auth
 export function register({ email, password, name }) {
   return client.post('/register', { email, password, name });
@@ -39,8 +55,8 @@ export function uploadTransactions(file) {
   data.append('file', file);
   return client.post('/transactions/upload', data);
 }
-export function listTransactions() {
-  return client.get('/transactions');
+export function listTransactions(params) {
+  return getAllPages('/transactions', params);
 }
 export function getTransaction(id) {
   return client.get(`/transactions/${id}`);
@@ -68,8 +84,8 @@ export function deleteOverride(id) {
 export function listCategories() {
   return client.get('/categories');
 }
-export function getCategoryTransactions(name) {
-  return client.get(`/categories/${name}/transactions`);
+export function getCategoryTransactions(name, params) {
+  return getAllPages(`/categories/${name}/transactions`, params);
 }
 
 // Goals